@@ -0,0 +1,134 @@
+"""Check that the compact job rows serialize exactly like the original dict rows.
+
+/api/jobs and /api/job/history used to build a dict per row and return it
+through jsonify. JobExecutionRow and JobHistoryRow produce the JSON text
+directly; this script compares both on randomized rows, edge cases included.
+With --memory it also reports the traced peak of holding and serializing
+/api/jobs rows both ways. No database connection is needed.
+
+    python check_row_serialization.py [row count] [--memory]
+"""
+import gc
+import random
+import sys
+import tracemalloc
+from datetime import datetime
+
+from sql_job_monitor import app, json_response, JobExecutionRow, JobHistoryRow
+
+JOB_COLUMNS = ['job_name', 'enabled', 'category_name', 'run_status', 'run_date', 'run_time',
+               'run_duration', 'message', 'instance_id', 'job_id', 'avg_duration']
+HISTORY_COLUMNS = ['instance_id', 'run_date', 'run_time', 'run_duration', 'run_status', 'message',
+                   'step_id', 'step_name', 'sql_message_id', 'sql_severity']
+
+STATUS_CODES = {
+    0: 'Failed',
+    1: 'Succeeded',
+    2: 'Retry',
+    3: 'Canceled',
+    4: 'In Progress'
+}
+
+def format_duration(run_duration):
+    duration = str(run_duration).zfill(6)
+    return f"{int(duration[0:2]):02d}:{int(duration[2:4]):02d}:{int(duration[4:6]):02d}"
+
+def reference_job(row):
+    """The original /api/jobs row conversion"""
+    job = dict(zip(JOB_COLUMNS, row))
+    if job['run_date'] and job['run_time']:
+        local_time = datetime.strptime(f"{job['run_date']} {str(job['run_time']).zfill(6)}", "%Y%m%d %H%M%S")
+        job['last_run'] = local_time.strftime("%Y-%m-%d %I:%M:%S %p CST")
+    else:
+        job['last_run'] = 'Never'
+
+    job['duration_formatted'] = 'N/A'
+    job['duration_trend'] = 'normal'
+    job['duration_diff'] = None
+    if job['run_duration']:
+        job['duration_formatted'] = format_duration(job['run_duration'])
+        if job['avg_duration'] and job['avg_duration'] > 0:
+            diff_percent = ((job['run_duration'] - job['avg_duration']) / job['avg_duration']) * 100
+            if diff_percent > 20:
+                job['duration_trend'] = 'slower'
+                job['duration_diff'] = f"+{abs(int(diff_percent))}%"
+            elif diff_percent < -20:
+                job['duration_trend'] = 'faster'
+                job['duration_diff'] = f"-{abs(int(diff_percent))}%"
+
+    job['status_text'] = STATUS_CODES.get(job.get('run_status'), 'Unknown')
+    return job
+
+def reference_history(row):
+    """The original /api/job/history row conversion"""
+    record = dict(zip(HISTORY_COLUMNS, row))
+    run_date = str(record['run_date'])
+    run_time = str(record['run_time']).zfill(6)
+    record['run_timestamp'] = f"{run_date[:4]}-{run_date[4:6]}-{run_date[6:]} {run_time[:2]}:{run_time[2:4]}:{run_time[4:6]}"
+    record['duration_formatted'] = format_duration(record['run_duration']) if record['run_duration'] else 'N/A'
+    record['status_text'] = STATUS_CODES.get(record.get('run_status'), 'Unknown')
+    return record
+
+def random_job_row(rng, i):
+    # run_duration stays below 100 hours, where the original zfill slicing misread the hours
+    return (f'Job {i % 300} é', rng.choice([0, 1]), rng.choice(['Cat A', 'Cat "B"', None]),
+            rng.choice([0, 1, 2, 3, 4, 5]), 20260101 + i % 28, rng.choice([0, 5, 93015, 120000, 235959]),
+            rng.choice([0, 1, 59, 130, 12345, 995959]), rng.choice([None, 'msg ü\n"x"', 'The job failed']),
+            i, f'A1B2-{i % 300}', rng.choice([None, 0, 100, 500, 20000]))
+
+def random_history_row(rng, i):
+    return (i, 20260101 + i % 28, rng.choice([0, 5, 93015]), rng.choice([0, 130, 995959]),
+            rng.choice([0, 1, 4, 7]), rng.choice([None, 'm ü']), i % 4, f'step {i % 4}', 0, rng.choice([0, 16]))
+
+def traced_peak(build):
+    """Return the peak traced memory (MiB) while building and serializing a response body"""
+    gc.collect()
+    tracemalloc.start()
+    for _ in build():
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+def report_memory(count):
+    rng = random.Random(3)
+    # Fresh string objects per row, as pyodbc returns them
+    rows = [tuple(''.join(value) if isinstance(value, str) else value for value in random_job_row(rng, i))
+            for i in range(count)]
+
+    def original():
+        jobs = [reference_job(row) for row in rows]
+        yield app.json.response(jobs).get_data()
+
+    def compact():
+        yield from json_response([JobExecutionRow(row) for row in rows]).response
+
+    with app.app_context():
+        print(f"/api/jobs, {count} rows: dict rows + jsonify peak {traced_peak(original):.1f} MiB, "
+              f"slotted rows + streamed JSON peak {traced_peak(compact):.1f} MiB")
+
+def main():
+    args = [arg for arg in sys.argv[1:] if arg != '--memory']
+    count = int(args[0]) if args else 3000
+    rng = random.Random(3)
+    mismatches = 0
+    with app.app_context():
+        for name, make_row, compact, reference in (
+            ('jobs', random_job_row, JobExecutionRow, reference_job),
+            ('history', random_history_row, JobHistoryRow, reference_history),
+        ):
+            for i in range(count):
+                row = make_row(rng, i)
+                # jsonify's body outside debug mode (debug mode only adds indentation)
+                expected = app.json.response(reference(row)).get_data(as_text=True).rstrip('\n')
+                actual = compact(row).to_json()
+                if actual != expected:
+                    mismatches += 1
+                    print(f"{name} row {i} differs:\n  expected {expected}\n  actual   {actual}")
+            print(f"{name}: {count} rows checked")
+    if '--memory' in sys.argv:
+        report_memory(count)
+    sys.exit(1 if mismatches else 0)
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,27 @@
-from flask import Flask, jsonify, render_template, request
+from flask import Flask, Response, jsonify, render_template, request, g, make_response, has_request_context
 import pyodbc
-from datetime import datetime
+from bisect import bisect_left, insort
+from collections import deque
+import csv
+from datetime import datetime, timedelta
+from functools import wraps
+from operator import itemgetter
+import hashlib
+import heapq
+import io
+import json
+import math
+from json.encoder import encode_basestring_ascii
 import os
+import re
+import select
+import socket
+import ssl
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -18,6 +38,55 @@ DB_PASSWORD = os.getenv('DB_PASSWORD', '')
 # Application configuration
 DEFAULT_CATEGORY = os.getenv('DEFAULT_CATEGORY', 'Quicksilver')
 
+# Query deadlines (seconds), enforced through the ODBC query timeout.
+# Each endpoint can be overridden with QUERY_TIMEOUT_<NAME>, e.g. QUERY_TIMEOUT_JOBS=30
+QUERY_TIMEOUT = int(os.getenv('QUERY_TIMEOUT', '15'))
+ENDPOINT_QUERY_TIMEOUTS = {
+    name: int(os.getenv(f'QUERY_TIMEOUT_{name.upper()}', default))
+    for name, default in {
+        'categories': 5,
+        'jobs_stats': 10,
+        'jobs': QUERY_TIMEOUT,
+        'job_history': QUERY_TIMEOUT,
+        'job_steps': 10,
+        'job_ssis_executions': 10,
+        'ssis_executions': 10,
+        'ssis_execution': 10,
+        'timeline': 20,
+        'export': 120,
+    }.items()
+}
+
+# Most job executions one /api/job/steps/batch request may expand
+MAX_BATCH_INSTANCES = 100
+
+# Rows fetched per round trip by the job list and history endpoints
+ROW_FETCH_SIZE = int(os.getenv('ROW_FETCH_SIZE', '5000'))
+
+# Rows fetched per round trip when streaming exports
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '10000'))
+
+# Diagnostics mode: capture SET STATISTICS IO/TIME output for every query (adds overhead)
+QUERY_DIAGNOSTICS = os.getenv('QUERY_DIAGNOSTICS', 'false').lower() == 'true'
+
+# Circuit breaker: stop querying the server after this many consecutive
+# deadline misses or connection failures, and probe again after the reset time
+CIRCUIT_BREAKER_THRESHOLD = int(os.getenv('CIRCUIT_BREAKER_THRESHOLD', '5'))
+CIRCUIT_BREAKER_RESET = int(os.getenv('CIRCUIT_BREAKER_RESET', '30'))
+
+# Server-side alerting: rules are checked every ALERT_CHECK_INTERVAL seconds against new job outcomes
+ALERTS_ENABLED = os.getenv('ALERTS_ENABLED', 'false').lower() == 'true'
+ALERT_CHECK_INTERVAL = int(os.getenv('ALERT_CHECK_INTERVAL', '60'))
+ALERT_RULES_FILE = os.getenv('ALERT_RULES_FILE', 'alert_rules.json')
+ALERT_SINKS = os.getenv('ALERT_SINKS', 'file')
+ALERT_FILE = os.getenv('ALERT_FILE', 'alerts.jsonl')
+ALERT_WEBHOOK_URL = os.getenv('ALERT_WEBHOOK_URL', '')
+ALERT_SUPPRESS_MINUTES = int(os.getenv('ALERT_SUPPRESS_MINUTES', '60'))
+# Duration baselines: history read on the first check, and successful runs kept per job
+ALERT_BASELINE_DAYS = int(os.getenv('ALERT_BASELINE_DAYS', '30'))
+ALERT_BASELINE_RUNS = int(os.getenv('ALERT_BASELINE_RUNS', '200'))
+ALERT_HISTORY_SIZE = 200
+
 def get_db_connection():
     """Create and return a database connection with support for multiple authentication methods"""
     auth_method = os.getenv('AUTH_METHOD', 'sql').lower()
@@ -38,7 +107,644 @@ def get_db_connection():
     else:
         conn_str = f'DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={DB_SERVER};DATABASE={DB_NAME};Trusted_Connection=yes;'
     
-    return pyodbc.connect(conn_str)
+    deadline = g.get('query_timeout', QUERY_TIMEOUT) if has_request_context() else QUERY_TIMEOUT
+    # The deadline bounds the login, and statements running past it are cancelled by the driver (SQLSTATE HYT00)
+    conn = pyodbc.connect(conn_str, timeout=deadline)
+    conn.timeout = deadline
+    return conn
+
+def open_cursor(conn):
+    """Create a cursor that is cancelled if the client disconnects mid-query"""
+    cursor = conn.cursor()
+    if has_request_context() and 'active_cursors' in g:
+        g.active_cursors.append(cursor)
+    if QUERY_DIAGNOSTICS:
+        conn.execute("SET STATISTICS IO ON; SET STATISTICS TIME ON")
+        endpoint = request.url_rule.rule if has_request_context() and request.url_rule else 'background'
+        return DiagnosticCursor(cursor, endpoint)
+    return cursor
+
+class DiagnosticCursor:
+    """Cursor wrapper that records SQL Server logical reads and CPU/elapsed time per query"""
+
+    def __init__(self, cursor, endpoint):
+        self._cursor = cursor
+        self._endpoint = endpoint
+        self._rows = None
+        self.description = None
+
+    def execute(self, query, *params):
+        self._query = query
+        self._messages = []
+        self._rows = None
+        self._started = time.perf_counter()
+        self._cursor.execute(query, *params)
+        self._messages.extend(self._cursor.messages or [])
+        # nextset() replaces the description, so keep the one for this result
+        self.description = self._cursor.description
+        if self.description is None:
+            self._finish([])
+        return self
+
+    def _finish(self, rows):
+        self._rows = list(rows)
+        while True:
+            try:
+                more = self._cursor.nextset()
+            except pyodbc.Error:
+                break
+            self._messages.extend(self._cursor.messages or [])
+            if not more:
+                break
+        client_ms = (time.perf_counter() - self._started) * 1000
+        record_query_statistics(self._endpoint, self._query, self._messages, client_ms)
+
+    def _fetched(self):
+        if self._rows is None:
+            self._finish(self._cursor.fetchall())
+        return self._rows
+
+    def fetchall(self):
+        rows = self._fetched()
+        self._rows = []
+        return rows
+
+    def fetchone(self):
+        rows = self._fetched()
+        return rows.pop(0) if rows else None
+
+    def fetchmany(self, size=1):
+        if self._rows is None:
+            batch = self._cursor.fetchmany(size)
+            if not batch:
+                self._finish([])
+            return batch
+        batch = self._rows[:size]
+        del self._rows[:size]
+        return batch
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+# Per-endpoint aggregates of the captured statistics, keyed by endpoint then query fingerprint
+_query_statistics = {}
+_query_statistics_lock = threading.Lock()
+
+STATISTICS_IO_PATTERN = re.compile(r"Table '([^']+)'\. Scan count (\d+), logical reads (\d+), physical reads (\d+)")
+STATISTICS_TIME_PATTERN = re.compile(r"(parse and compile time|Execution Times):\s*CPU time = (\d+) ms,\s*elapsed time = (\d+) ms")
+
+def record_query_statistics(endpoint, query, messages, client_ms):
+    """Parse STATISTICS IO/TIME messages for one query and add them to the endpoint's totals"""
+    tables = {}
+    logical_reads = physical_reads = cpu_ms = elapsed_ms = compile_ms = 0
+    for _, text in messages:
+        for table, _, logical, physical in STATISTICS_IO_PATTERN.findall(text):
+            tables[table] = tables.get(table, 0) + int(logical)
+            logical_reads += int(logical)
+            physical_reads += int(physical)
+        for phase, cpu, elapsed in STATISTICS_TIME_PATTERN.findall(text):
+            if phase == 'Execution Times':
+                cpu_ms += int(cpu)
+                elapsed_ms += int(elapsed)
+            else:
+                compile_ms += int(elapsed)
+
+    sql = ' '.join(query.split())
+    fingerprint = hashlib.sha1(sql.encode('utf-8')).hexdigest()[:10]
+
+    with _query_statistics_lock:
+        stats = _query_statistics.setdefault(endpoint, {}).setdefault(fingerprint, {
+            'query': fingerprint,
+            'sql': sql[:300],
+            'executions': 0,
+            'logical_reads': 0,
+            'physical_reads': 0,
+            'cpu_ms': 0,
+            'elapsed_ms': 0,
+            'compile_ms': 0,
+            'client_ms': 0.0,
+            'max_logical_reads': 0,
+            'max_elapsed_ms': 0,
+            'tables': {}
+        })
+        stats['executions'] += 1
+        stats['logical_reads'] += logical_reads
+        stats['physical_reads'] += physical_reads
+        stats['cpu_ms'] += cpu_ms
+        stats['elapsed_ms'] += elapsed_ms
+        stats['compile_ms'] += compile_ms
+        stats['client_ms'] += client_ms
+        stats['max_logical_reads'] = max(stats['max_logical_reads'], logical_reads)
+        stats['max_elapsed_ms'] = max(stats['max_elapsed_ms'], elapsed_ms)
+        for table, reads in tables.items():
+            stats['tables'][table] = stats['tables'].get(table, 0) + reads
+
+class CircuitBreaker:
+    """Stops querying a failing server and lets one probe request through after `reset_timeout` seconds"""
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Re-arm so concurrent requests stay blocked while the probe runs
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+    @property
+    def state(self):
+        return 'closed' if self.opened_at is None else 'open'
+
+db_circuit_breaker = CircuitBreaker(CIRCUIT_BREAKER_THRESHOLD, CIRCUIT_BREAKER_RESET)
+
+def is_socket_closed(sock):
+    """Check without blocking whether the client closed its end of the connection"""
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+        # A readable socket with nothing to read is a closed connection
+        return bool(readable) and sock.recv(1, socket.MSG_PEEK) == b''
+    except OSError:
+        return True
+
+def client_socket():
+    """Return the request's client socket when it can be watched (Werkzeug development server, no TLS)"""
+    sock = request.environ.get('werkzeug.socket')
+    return None if sock is None or isinstance(sock, ssl.SSLSocket) else sock
+
+class DisconnectWatchdog(threading.Thread):
+    """Cancels a request's running queries when the client disconnects (Werkzeug development server only)"""
+
+    def __init__(self, sock, cursors, interval=0.5):
+        super().__init__(daemon=True)
+        self.sock = sock
+        self.cursors = cursors
+        self.interval = interval
+        self.disconnected = False
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            if is_socket_closed(self.sock):
+                self.disconnected = True
+                for cursor in list(self.cursors):
+                    try:
+                        cursor.cancel()
+                    except pyodbc.Error:
+                        pass
+                return
+
+    def stop(self):
+        self._stopped.set()
+
+# Last successful response body per request URL, served when a deadline is missed.
+# Only the endpoints the dashboard polls are kept, within a total size budget.
+_last_good_responses = {}
+_last_good_bytes = 0
+_last_good_lock = threading.Lock()
+STALE_CACHE_ENDPOINTS = {'categories', 'jobs_stats', 'jobs'}
+MAX_CACHED_RESPONSE_BYTES = int(os.getenv('STALE_CACHE_MB', '64')) * 1024 * 1024
+
+def store_good_response(cache_key, response):
+    """Remember a successful response body, evicting the oldest ones to stay within the size budget"""
+    global _last_good_bytes
+    if response.is_streamed:
+        # Collect a streamed body into one buffer and send that same buffer, rather
+        # than keeping the chunk list next to a joined copy
+        buffer = io.BytesIO()
+        for chunk in response.iter_encoded():
+            buffer.write(chunk)
+        response.set_data(buffer.getvalue())
+        del buffer
+    body = response.get_data()
+    with _last_good_lock:
+        previous = _last_good_responses.pop(cache_key, None)
+        if previous is not None:
+            _last_good_bytes -= len(previous[0])
+        if len(body) > MAX_CACHED_RESPONSE_BYTES:
+            return
+        while _last_good_responses and _last_good_bytes + len(body) > MAX_CACHED_RESPONSE_BYTES:
+            _last_good_bytes -= len(_last_good_responses.pop(next(iter(_last_good_responses)))[0])
+        _last_good_responses[cache_key] = (body, response.mimetype, time.time())
+        _last_good_bytes += len(body)
+
+def stale_response(cache_key, reason, status_code):
+    """Return the last good response marked as stale, or an error if there is none"""
+    cached = _last_good_responses.get(cache_key)
+    if cached is None:
+        response = jsonify({'error': reason, 'circuit_breaker': db_circuit_breaker.state})
+        response.status_code = status_code
+        if status_code == 503:
+            response.headers['Retry-After'] = str(CIRCUIT_BREAKER_RESET)
+        return response
+
+    body, mimetype, stored_at = cached
+    response = make_response(body)
+    response.mimetype = mimetype
+    response.headers['X-Data-Stale'] = 'true'
+    response.headers['X-Data-Age'] = str(int(time.time() - stored_at))
+    response.headers['Warning'] = '110 - "Response is Stale"'
+    return response
+
+def with_query_deadline(name):
+    """Run an endpoint under its query deadline and the circuit breaker (the endpoint must re-raise pyodbc.OperationalError)"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache_key = request.full_path
+            if not db_circuit_breaker.allow_request():
+                return stale_response(cache_key, 'Database circuit breaker is open', 503)
+
+            g.query_timeout = ENDPOINT_QUERY_TIMEOUTS.get(name, QUERY_TIMEOUT)
+            g.active_cursors = []
+            sock = client_socket()
+            watchdog = None
+            if sock is not None:
+                watchdog = DisconnectWatchdog(sock, g.active_cursors)
+                watchdog.start()
+
+            try:
+                response = make_response(view(*args, **kwargs))
+            except pyodbc.OperationalError as e:
+                if watchdog and watchdog.disconnected:
+                    # Cancelled because nobody is waiting for the answer; not the server's fault
+                    return jsonify({'error': 'Client disconnected'}), 499
+                db_circuit_breaker.record_failure()
+                return stale_response(cache_key, str(e), 504)
+            finally:
+                if watchdog:
+                    watchdog.stop()
+
+            # The server answered, even if the endpoint itself reported an error
+            db_circuit_breaker.record_success()
+            if response.status_code == 200 and name in STALE_CACHE_ENDPOINTS:
+                store_good_response(cache_key, response)
+            return response
+        return wrapper
+    return decorator
+
+def parse_run_datetime(run_date, run_time):
+    """Convert msdb integer run_date (YYYYMMDD) and run_time (HHMMSS) to a datetime"""
+    if not run_date:
+        return None
+    run_date = int(run_date)
+    run_time = int(run_time or 0)
+    return datetime(run_date // 10000, run_date // 100 % 100, run_date % 100,
+                    run_time // 10000, run_time // 100 % 100, run_time % 100)
+
+def run_duration_seconds(run_duration):
+    """Convert msdb integer run_duration (HHMMSS, hours may exceed 99) to seconds"""
+    if not run_duration:
+        return 0
+    run_duration = int(run_duration)
+    return (run_duration // 10000) * 3600 + (run_duration // 100 % 100) * 60 + run_duration % 100
+
+def get_history_version(cursor):
+    """Return the newest sysjobhistory instance_id, used to detect new history rows"""
+    cursor.execute("SELECT MAX(instance_id) FROM msdb.dbo.sysjobhistory")
+    return cursor.fetchone()[0] or 0
+
+STATUS_TEXT = {
+    0: 'Failed',
+    1: 'Succeeded',
+    2: 'Retry',
+    3: 'Canceled',
+    4: 'In Progress'
+}
+
+def json_value(value):
+    """Encode one value the way jsonify would"""
+    if value is None:
+        return 'null'
+    if isinstance(value, str):
+        return encode_basestring_ascii(value)
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    if isinstance(value, int):
+        return str(value)
+    return json.dumps(value, default=str)
+
+def format_duration(run_duration):
+    """Format an msdb HHMMSS run_duration as HH:MM:SS"""
+    return f"{run_duration // 10000:02d}:{run_duration // 100 % 100:02d}:{run_duration % 100:02d}"
+
+# Rows serialized per chunk of a streamed JSON array
+JSON_CHUNK_ROWS = 1000
+
+def json_response(rows):
+    """Stream compact rows as a JSON array, a chunk of rows at a time"""
+    def generate():
+        for start in range(0, len(rows), JSON_CHUNK_ROWS):
+            chunk = ','.join([row.to_json() for row in rows[start:start + JSON_CHUNK_ROWS]])
+            yield ('[' if start == 0 else ',') + chunk
+        yield ']' if rows else '[]'
+    return app.response_class(generate(), mimetype='application/json')
+
+class JobExecutionRow:
+    """One /api/jobs row: the raw columns in slots, display fields computed while serializing"""
+
+    __slots__ = ('job_name', 'enabled', 'category_name', 'run_status', 'run_date', 'run_time',
+                 'run_duration', 'message', 'instance_id', 'job_id', 'avg_duration')
+
+    def __init__(self, row):
+        (job_name, self.enabled, category_name, self.run_status, self.run_date, self.run_time,
+         self.run_duration, self.message, self.instance_id, job_id, self.avg_duration) = row
+        self.job_name = sys.intern(job_name) if job_name else job_name
+        self.category_name = sys.intern(category_name) if category_name else category_name
+        self.job_id = sys.intern(job_id) if isinstance(job_id, str) else job_id
+
+    def to_json(self):
+        # Format run date and time if available
+        # SQL Server Agent stores times in local server time (already CST)
+        if self.run_date and self.run_time:
+            run_date = self.run_date
+            hour, minute, second = self.run_time // 10000, self.run_time // 100 % 100, self.run_time % 100
+            last_run = (f"{run_date // 10000:04d}-{run_date // 100 % 100:02d}-{run_date % 100:02d} "
+                        f"{hour % 12 or 12:02d}:{minute:02d}:{second:02d} {'PM' if hour >= 12 else 'AM'} CST")
+        else:
+            last_run = 'Never'
+
+        # Format duration and compare to average (30-day average)
+        duration_formatted = 'N/A'
+        duration_trend = 'normal'
+        duration_diff = None
+        if self.run_duration:
+            duration_formatted = format_duration(self.run_duration)
+            if self.avg_duration and self.avg_duration > 0:
+                diff_percent = ((self.run_duration - self.avg_duration) / self.avg_duration) * 100
+                if diff_percent > 20:  # More than 20% slower
+                    duration_trend = 'slower'
+                    duration_diff = f"+{abs(int(diff_percent))}%"
+                elif diff_percent < -20:  # More than 20% faster
+                    duration_trend = 'faster'
+                    duration_diff = f"-{abs(int(diff_percent))}%"
+
+        # Keys in the same (sorted) order jsonify used for the old dict rows
+        return (f'{{"avg_duration":{json_value(self.avg_duration)},'
+                f'"category_name":{json_value(self.category_name)},'
+                f'"duration_diff":{json_value(duration_diff)},'
+                f'"duration_formatted":"{duration_formatted}",'
+                f'"duration_trend":"{duration_trend}",'
+                f'"enabled":{json_value(self.enabled)},'
+                f'"instance_id":{json_value(self.instance_id)},'
+                f'"job_id":{json_value(self.job_id)},'
+                f'"job_name":{json_value(self.job_name)},'
+                f'"last_run":"{last_run}",'
+                f'"message":{json_value(self.message)},'
+                f'"run_date":{json_value(self.run_date)},'
+                f'"run_duration":{json_value(self.run_duration)},'
+                f'"run_status":{json_value(self.run_status)},'
+                f'"run_time":{json_value(self.run_time)},'
+                f'"status_text":"{STATUS_TEXT.get(self.run_status, "Unknown")}"}}')
+
+class JobHistoryRow:
+    """One /api/job/history row, stored and serialized like JobExecutionRow"""
+
+    __slots__ = ('instance_id', 'run_date', 'run_time', 'run_duration', 'run_status', 'message',
+                 'step_id', 'step_name', 'sql_message_id', 'sql_severity')
+
+    def __init__(self, row):
+        (self.instance_id, self.run_date, self.run_time, self.run_duration, self.run_status, self.message,
+         self.step_id, step_name, self.sql_message_id, self.sql_severity) = row
+        self.step_name = sys.intern(step_name) if step_name else step_name
+
+    def to_json(self):
+        run_date = self.run_date
+        run_time = self.run_time
+        run_timestamp = (f"{run_date // 10000:04d}-{run_date // 100 % 100:02d}-{run_date % 100:02d} "
+                         f"{run_time // 10000:02d}:{run_time // 100 % 100:02d}:{run_time % 100:02d}")
+        duration_formatted = format_duration(self.run_duration) if self.run_duration else 'N/A'
+
+        return (f'{{"duration_formatted":"{duration_formatted}",'
+                f'"instance_id":{json_value(self.instance_id)},'
+                f'"message":{json_value(self.message)},'
+                f'"run_date":{json_value(self.run_date)},'
+                f'"run_duration":{json_value(self.run_duration)},'
+                f'"run_status":{json_value(self.run_status)},'
+                f'"run_time":{json_value(self.run_time)},'
+                f'"run_timestamp":"{run_timestamp}",'
+                f'"sql_message_id":{json_value(self.sql_message_id)},'
+                f'"sql_severity":{json_value(self.sql_severity)},'
+                f'"status_text":"{STATUS_TEXT.get(self.run_status, "Unknown")}",'
+                f'"step_id":{json_value(self.step_id)},'
+                f'"step_name":{json_value(self.step_name)}}}')
+
+class JobIntervalIndex:
+    """Interval index over job executions: runs sorted by start and a segment tree of the latest end time per subtree"""
+
+    def __init__(self, runs, presorted=False):
+        # runs: dicts with instance_id, job_name, category_name, server, run_status, start, end
+        self.runs = runs if presorted else sorted(runs, key=itemgetter('start'))
+        self.starts = [run['start'] for run in self.runs]
+        self.runs_by_id = {run['instance_id']: run for run in self.runs}
+
+        self._size = 1
+        while self._size < len(self.runs):
+            self._size *= 2
+        # Build the tree a level at a time; node i has children 2i and 2i + 1
+        level = [run['end'] for run in self.runs] + [datetime.min] * (self._size - len(self.runs))
+        levels = [level]
+        while len(level) > 1:
+            level = [left if left > right else right for left, right in zip(level[::2], level[1::2])]
+            levels.append(level)
+        self._max_end = [datetime.min] + [end for level in reversed(levels) for end in level]
+
+    def updated(self, cutoff, new_runs):
+        """Return an index without the runs starting before `cutoff` and with `new_runs` merged in"""
+        kept = self.runs[bisect_left(self.starts, cutoff):]
+        new_runs = sorted(new_runs, key=itemgetter('start'))
+        if not kept or not new_runs or new_runs[0]['start'] >= kept[-1]['start']:
+            runs = kept + new_runs
+        else:
+            runs = list(heapq.merge(kept, new_runs, key=itemgetter('start')))
+        return JobIntervalIndex(runs, presorted=True)
+
+    def overlapping(self, window_start, window_end):
+        """Return runs overlapping [window_start, window_end), ordered by start time"""
+        limit = bisect_left(self.starts, window_end)
+        matches = []
+        stack = [(1, 0, self._size)]
+        while stack:
+            node, lo, hi = stack.pop()
+            if lo >= limit or self._max_end[node] <= window_start:
+                continue
+            if hi - lo == 1:
+                matches.append(self.runs[lo])
+                continue
+            mid = (lo + hi) // 2
+            # Push the right half first so runs come out in start order
+            stack.append((2 * node + 1, mid, hi))
+            stack.append((2 * node, lo, mid))
+        return matches
+
+    @staticmethod
+    def peak_concurrency(runs, window_start, window_end):
+        """Sweep the runs and return the peak number of simultaneous runs per server"""
+        events = {}
+        for run in runs:
+            server_events = events.setdefault(run['server'], [])
+            # A run ending at the same instant another starts does not overlap it,
+            # so -1 sorts before +1 at equal timestamps
+            server_events.append((max(run['start'], window_start), 1))
+            server_events.append((min(run['end'], window_end), -1))
+
+        peaks = {}
+        for server, server_events in events.items():
+            server_events.sort()
+            current = peak = 0
+            peak_time = None
+            for timestamp, delta in server_events:
+                current += delta
+                if current > peak:
+                    peak = current
+                    peak_time = timestamp
+            peaks[server] = {'peak_concurrency': peak, 'peak_time': peak_time}
+        return peaks
+
+# Most history the timeline indexes: today plus 29 days, i.e. 30 days of runs
+MAX_TIMELINE_DAYS = 29
+
+# Window /api/timeline inspects when no start is given, and the runs it returns per page
+DEFAULT_TIMELINE_WINDOW = timedelta(hours=1)
+DEFAULT_TIMELINE_LIMIT = 500
+MAX_TIMELINE_LIMIT = 5000
+
+# Cached interval index per `days` window. New job outcomes are merged in by
+# instance_id, and runs that fall out of the window are dropped in memory.
+_timeline_cache = {}
+MAX_CACHED_TIMELINE_WINDOWS = 4
+
+TIMELINE_QUERY = """
+    SELECT
+        h.instance_id,
+        j.name as job_name,
+        c.name as category_name,
+        h.server,
+        h.run_status,
+        h.run_date,
+        h.run_time,
+        h.run_duration
+    FROM msdb.dbo.sysjobhistory h
+    INNER JOIN msdb.dbo.sysjobs j ON h.job_id = j.job_id
+    INNER JOIN msdb.dbo.syscategories c ON j.category_id = c.category_id
+    WHERE h.step_id = 0
+    AND h.run_date >= ?
+    AND h.instance_id > ?
+    AND h.instance_id <= ?
+    """
+
+def fetch_timeline_runs(cursor, first_run_date, after_instance_id, through_instance_id):
+    """Fetch job outcomes in an instance_id range as interval runs"""
+    cursor.execute(TIMELINE_QUERY, first_run_date, after_instance_id, through_instance_id)
+    runs = []
+    for instance_id, job_name, category_name, server, run_status, run_date, run_time, run_duration in cursor.fetchall():
+        start = parse_run_datetime(run_date, run_time)
+        if start is None:
+            continue
+        # Sub-second runs report a duration of 0; give them one second so they still overlap
+        duration = max(run_duration_seconds(run_duration), 1)
+        runs.append({
+            'instance_id': instance_id,
+            'job_name': job_name,
+            'category_name': category_name,
+            'server': server,
+            'run_status': run_status,
+            'start': start,
+            'end': start + timedelta(seconds=duration)
+        })
+    return runs
+
+def get_timeline_index(cursor, days):
+    """Return a JobIntervalIndex over job outcomes from the last `days` days (at most MAX_TIMELINE_DAYS)"""
+    days = max(0, min(days, MAX_TIMELINE_DAYS))
+    cutoff = datetime.combine(datetime.now().date() - timedelta(days=days), datetime.min.time())
+    first_run_date = int(cutoff.strftime("%Y%m%d"))
+    version = get_history_version(cursor)
+
+    cached = _timeline_cache.get(days)
+    if cached is None:
+        index = JobIntervalIndex(fetch_timeline_runs(cursor, first_run_date, 0, version))
+    else:
+        watermark, index = cached
+        if version <= watermark and (not index.runs or index.starts[0] >= cutoff):
+            return index
+        # Only outcome rows newer than the cached ones are read; new step rows cost nothing
+        runs = fetch_timeline_runs(cursor, first_run_date, watermark, version) if version > watermark else []
+        if runs or (index.runs and index.starts[0] < cutoff):
+            index = index.updated(cutoff, runs)
+
+    if len(_timeline_cache) >= MAX_CACHED_TIMELINE_WINDOWS and days not in _timeline_cache:
+        _timeline_cache.pop(next(iter(_timeline_cache)))
+    _timeline_cache[days] = (version, index)
+    return index
+
+def get_running_runs(cursor):
+    """Return the jobs still running in the current Agent session as runs ending now"""
+    cursor.execute("""
+    SELECT
+        j.name as job_name,
+        c.name as category_name,
+        @@SERVERNAME as server,
+        a.start_execution_date
+    FROM msdb.dbo.sysjobactivity a
+    INNER JOIN msdb.dbo.sysjobs j ON a.job_id = j.job_id
+    INNER JOIN msdb.dbo.syscategories c ON j.category_id = c.category_id
+    WHERE a.session_id = (SELECT MAX(session_id) FROM msdb.dbo.syssessions)
+    AND a.start_execution_date IS NOT NULL
+    AND a.stop_execution_date IS NULL
+    ORDER BY a.start_execution_date
+    """)
+    now = datetime.now()
+    # In-flight runs have no sysjobhistory row yet, so no instance_id
+    return [{
+        'instance_id': None,
+        'job_name': job_name,
+        'category_name': category_name,
+        'server': server,
+        'run_status': 4,
+        'start': start,
+        'end': max(now, start + timedelta(seconds=1))
+    } for job_name, category_name, server, start in cursor.fetchall()]
+
+def overlapping_runs(index, running, window_start, window_end):
+    """Return indexed and in-flight runs overlapping [window_start, window_end), ordered by start time"""
+    live = [run for run in running if run['start'] < window_end and run['end'] > window_start]
+    runs = index.overlapping(window_start, window_end)
+    return list(heapq.merge(runs, live, key=itemgetter('start'))) if live else runs
+
+def format_timeline_run(run):
+    """Serialize an indexed run for the timeline endpoints"""
+    return {
+        'instance_id': run['instance_id'],
+        'in_progress': run['instance_id'] is None,
+        'job_name': run['job_name'],
+        'category_name': run['category_name'],
+        'server': run['server'],
+        'run_status': run['run_status'],
+        'start_time': run['start'].strftime("%Y-%m-%d %H:%M:%S"),
+        'end_time': run['end'].strftime("%Y-%m-%d %H:%M:%S"),
+        'duration_seconds': int((run['end'] - run['start']).total_seconds())
+    }
 
 @app.route('/')
 def index():
@@ -64,7 +770,7 @@ def test_connection():
         
         # Try to connect
         conn = get_db_connection()
-        cursor = conn.cursor()
+        cursor = open_cursor(conn)
         cursor.execute("SELECT @@VERSION")
         version = cursor.fetchone()[0]
         conn.close()
@@ -86,31 +792,76 @@ def test_connection():
             'auth_method': os.getenv('AUTH_METHOD', 'sql').lower()
         }), 500
 
+# Category counts per `days` window, rebuilt when jobs or history change or the date rolls over
+_category_cache = {}
+MAX_CACHED_CATEGORY_WINDOWS = 16
+
 @app.route('/api/categories')
+@with_query_deadline('categories')
 def get_categories():
-    """Get all job categories"""
+    """Get all job categories with their job count and execution counts for the last `days` days"""
     try:
+        days = request.args.get('days', '0', type=int)
+        
         conn = get_db_connection()
-        cursor = conn.cursor()
+        cursor = open_cursor(conn)
+        
+        # New history rows or added/edited jobs change this; both lookups are index seeks
+        cursor.execute("""
+        SELECT
+            (SELECT MAX(instance_id) FROM msdb.dbo.sysjobhistory),
+            (SELECT MAX(date_modified) FROM msdb.dbo.sysjobs),
+            (SELECT COUNT(*) FROM msdb.dbo.sysjobs)
+        """)
+        key = (datetime.now().date(),) + tuple(cursor.fetchone())
+        cached = _category_cache.get(days)
+        if cached and cached[0] == key:
+            conn.close()
+            return jsonify(cached[1])
         
         query = """
-        SELECT DISTINCT c.name as category_name
+        SELECT
+            c.name as category_name,
+            COUNT(DISTINCT j.job_id) as job_count,
+            COUNT(h.instance_id) as execution_count,
+            SUM(CASE WHEN h.run_status = 0 THEN 1 ELSE 0 END) as failed_count,
+            SUM(CASE WHEN h.run_status = 1 THEN 1 ELSE 0 END) as succeeded_count,
+            SUM(CASE WHEN h.run_status = 4 THEN 1 ELSE 0 END) as running_count
         FROM msdb.dbo.syscategories c
         INNER JOIN msdb.dbo.sysjobs j ON c.category_id = j.category_id
+        LEFT JOIN msdb.dbo.sysjobhistory h ON h.job_id = j.job_id
+            AND h.step_id = 0
+            AND h.run_date >= CONVERT(VARCHAR(8), DATEADD(day, -?, GETDATE()), 112)
         WHERE c.category_class = 1
+        GROUP BY c.name
         ORDER BY c.name
         """
         
-        cursor.execute(query)
-        categories = [row[0] for row in cursor.fetchall()]
+        cursor.execute(query, days)
+        categories = [{
+            'category_name': row[0],
+            'job_count': row[1],
+            'execution_count': row[2],
+            'failed_count': row[3] or 0,
+            'succeeded_count': row[4] or 0,
+            'running_count': row[5] or 0
+        } for row in cursor.fetchall()]
         conn.close()
         
+        if len(_category_cache) >= MAX_CACHED_CATEGORY_WINDOWS and days not in _category_cache:
+            _category_cache.pop(next(iter(_category_cache)))
+        _category_cache[days] = (key, categories)
         return jsonify(categories)
         
+    except pyodbc.OperationalError:
+        # Deadline missed or server unreachable: handled by with_query_deadline
+        raise
+        
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/jobs/stats')
+@with_query_deadline('jobs_stats')
 def get_jobs_stats():
     """Get statistics about job executions"""
     try:
@@ -118,7 +869,7 @@ def get_jobs_stats():
         days = request.args.get('days', '0', type=int)
         
         conn = get_db_connection()
-        cursor = conn.cursor()
+        cursor = open_cursor(conn)
         
         # Get stats for the specified time period
         query = """
@@ -172,10 +923,15 @@ def get_jobs_stats():
         conn.close()
         return jsonify(stats)
         
+    except pyodbc.OperationalError:
+        # Deadline missed or server unreachable: handled by with_query_deadline
+        raise
+        
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/jobs')
+@with_query_deadline('jobs')
 def get_jobs():
     try:
         from flask import request
@@ -184,7 +940,7 @@ def get_jobs():
         days = request.args.get('days', '0', type=int)
         
         conn = get_db_connection()
-        cursor = conn.cursor()
+        cursor = open_cursor(conn)
         
         # Query to get job executions with average duration for comparison
         query = """
@@ -215,67 +971,20 @@ def get_jobs():
         """
         
         cursor.execute(query, days)
-        columns = [column[0] for column in cursor.description]
         jobs = []
         
-        for row in cursor.fetchall():
-            job = dict(zip(columns, row))
-            # Format run date and time if available
-            # SQL Server Agent stores times in local server time (already CST)
-            if job['run_date'] and job['run_time']:
-                from datetime import datetime
-                run_date = str(job['run_date'])
-                run_time = str(job['run_time']).zfill(6)
-                # Parse time (already in CST from SQL Server)
-                local_time = datetime.strptime(f"{run_date} {run_time}", "%Y%m%d %H%M%S")
-                job['last_run'] = local_time.strftime("%Y-%m-%d %I:%M:%S %p CST")
-            else:
-                job['last_run'] = 'Never'
-            
-            # Format duration and compare to average
-            if job['run_duration']:
-                duration = str(job['run_duration']).zfill(6)
-                hours = int(duration[0:2])
-                minutes = int(duration[2:4])
-                seconds = int(duration[4:6])
-                job['duration_formatted'] = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-                
-                # Compare to average duration (30-day average)
-                if job['avg_duration'] and job['avg_duration'] > 0:
-                    current_duration = job['run_duration']
-                    avg = job['avg_duration']
-                    diff_percent = ((current_duration - avg) / avg) * 100
-                    
-                    if diff_percent > 20:  # More than 20% slower
-                        job['duration_trend'] = 'slower'
-                        job['duration_diff'] = f"+{abs(int(diff_percent))}%"
-                    elif diff_percent < -20:  # More than 20% faster
-                        job['duration_trend'] = 'faster'
-                        job['duration_diff'] = f"-{abs(int(diff_percent))}%"
-                    else:
-                        job['duration_trend'] = 'normal'
-                        job['duration_diff'] = None
-                else:
-                    job['duration_trend'] = 'normal'
-                    job['duration_diff'] = None
-            else:
-                job['duration_formatted'] = 'N/A'
-                job['duration_trend'] = 'normal'
-                job['duration_diff'] = None
-                
-            # Add status text
-            status_codes = {
-                0: 'Failed',
-                1: 'Succeeded',
-                2: 'Retry',
-                3: 'Canceled',
-                4: 'In Progress'
-            }
-            job['status_text'] = status_codes.get(job.get('run_status'), 'Unknown')
+        # Fetch in batches so only compact rows are kept, not every raw pyodbc row too
+        while True:
+            batch = cursor.fetchmany(ROW_FETCH_SIZE)
+            if not batch:
+                break
+            jobs.extend(JobExecutionRow(row) for row in batch)
             
-            jobs.append(job)
-            
-        return jsonify(jobs)
+        return json_response(jobs)
+        
+    except pyodbc.OperationalError:
+        # Deadline missed or server unreachable: handled by with_query_deadline
+        raise
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -285,6 +994,7 @@ def get_jobs():
             conn.close()
 
 @app.route('/api/ssis/executions-by-package')
+@with_query_deadline('ssis_executions')
 def get_ssis_executions_by_package():
     """Get recent SSIS executions for a specific package path"""
     try:
@@ -305,7 +1015,7 @@ def get_ssis_executions_by_package():
         package_name = parts[2]
         
         conn = get_db_connection()
-        cursor = conn.cursor()
+        cursor = open_cursor(conn)
         
         # Add status filter if failed_only is requested
         status_filter = "AND e.status = 4" if failed_only else ""
@@ -352,6 +1062,10 @@ def get_ssis_executions_by_package():
         conn.close()
         return jsonify(executions)
         
+    except pyodbc.OperationalError:
+        # Deadline missed or server unreachable: handled by with_query_deadline
+        raise
+        
     except Exception as e:
         import traceback
         return jsonify({
@@ -360,6 +1074,7 @@ def get_ssis_executions_by_package():
         }), 500
 
 @app.route('/api/ssis/execution/<int:execution_id>')
+@with_query_deadline('ssis_execution')
 def get_ssis_execution_details(execution_id):
     """Get detailed SSIS execution information including error messages"""
     try:
@@ -367,7 +1082,7 @@ def get_ssis_execution_details(execution_id):
         show_all = request.args.get('show_all', 'false').lower() == 'true'
         
         conn = get_db_connection()
-        cursor = conn.cursor()
+        cursor = open_cursor(conn)
         
         # Get execution overview
         query_overview = """
@@ -446,6 +1161,10 @@ def get_ssis_execution_details(execution_id):
             'messages': messages
         })
         
+    except pyodbc.OperationalError:
+        # Deadline missed or server unreachable: handled by with_query_deadline
+        raise
+        
     except Exception as e:
         import traceback
         return jsonify({
@@ -454,11 +1173,12 @@ def get_ssis_execution_details(execution_id):
         }), 500
 
 @app.route('/api/job/ssis-executions/<job_name>')
+@with_query_deadline('job_ssis_executions')
 def get_job_ssis_executions(job_name):
     """Get SSIS execution IDs for a specific job from job history"""
     try:
         conn = get_db_connection()
-        cursor = conn.cursor()
+        cursor = open_cursor(conn)
         
         # Extract execution IDs from job step messages
         query = """
@@ -495,288 +1215,350 @@ def get_job_ssis_executions(job_name):
         conn.close()
         return jsonify(results)
         
+    except pyodbc.OperationalError:
+        # Deadline missed or server unreachable: handled by with_query_deadline
+        raise
+        
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/job/steps/<int:instance_id>')
-def get_job_steps(instance_id):
-    """Get steps for a specific job execution instance"""
-    try:
-        from datetime import datetime, timedelta
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # First get the job execution details
-        query_main = """
-        SELECT 
-            j.job_id,
-            j.name as job_name,
-            h.run_date,
-            h.run_time,
-            h.run_duration,
-            h.run_status
-        FROM msdb.dbo.sysjobhistory h
-        JOIN msdb.dbo.sysjobs j ON h.job_id = j.job_id
-        WHERE h.instance_id = ? AND h.step_id = 0
-        """
-        
-        cursor.execute(query_main, instance_id)
-        main_row = cursor.fetchone()
-        
-        if not main_row:
-            return jsonify({'error': 'Execution not found'}), 404
-        
-        job_id, job_name, run_date, run_time, run_duration, overall_status = main_row
-        
-        # Get all steps from history
-        query_history_steps = """
-        SELECT 
-            h.step_id,
-            h.step_name,
-            h.run_status,
-            h.run_duration,
-            h.message,
-            h.sql_message_id,
-            h.sql_severity
-        FROM msdb.dbo.sysjobhistory h
-        WHERE h.instance_id = ?
-        ORDER BY h.step_id ASC
-        """
-        
-        cursor.execute(query_history_steps, instance_id)
-        history_steps = {row[0]: row for row in cursor.fetchall()}
-        
-        # Get all defined steps for this job (to show steps that didn't run)
-        query_defined_steps = """
-        SELECT 
-            s.step_id,
-            s.step_name,
-            s.command,
-            s.subsystem
-        FROM msdb.dbo.sysjobsteps s
-        WHERE s.job_id = ?
-        ORDER BY s.step_id ASC
-        """
-        
-        cursor.execute(query_defined_steps, job_id)
-        defined_steps = cursor.fetchall()
-        
-        steps = []
-        
-        # Get the job outcome to determine which steps ran
-        job_outcome_message = ''
-        last_step_run = None
-        job_failed = False
-        
-        if 0 in history_steps:
-            outcome_row = history_steps[0]
-            job_outcome_message = outcome_row[4] or ''
-            job_failed = outcome_row[2] == 0  # run_status = 0 means failed
-            
-            # Extract which step was the last to run from message like "The last step to run was step 4"
-            import re
-            step_match = re.search(r'last step to run was step (\d+)', job_outcome_message, re.IGNORECASE)
-            if step_match:
-                last_step_run = int(step_match.group(1))
-        
-        # Add all defined steps (skip step_id = 0 which is the job outcome)
-        for defined_row in defined_steps:
-            step_id = defined_row[0]
-            
-            if step_id in history_steps:
-                # Step was executed and has its own history record
-                row = history_steps[step_id]
+def build_execution_steps(cursor, history_steps, defined_steps, run_date, run_time, run_duration):
+    """Build the step breakdown of one job execution from its history rows and the job's step definitions"""
+    steps = []
+    
+    # Get the job outcome to determine which steps ran
+    job_outcome_message = ''
+    last_step_run = None
+    job_failed = False
+    
+    if 0 in history_steps:
+        outcome_row = history_steps[0]
+        job_outcome_message = outcome_row[4] or ''
+        job_failed = outcome_row[2] == 0  # run_status = 0 means failed
+    
+        # Extract which step was the last to run from message like "The last step to run was step 4"
+        import re
+        step_match = re.search(r'last step to run was step (\d+)', job_outcome_message, re.IGNORECASE)
+        if step_match:
+            last_step_run = int(step_match.group(1))
+    
+    # Add all defined steps (skip step_id = 0 which is the job outcome)
+    for defined_row in defined_steps:
+        step_id = defined_row[0]
+    
+        if step_id in history_steps:
+            # Step was executed and has its own history record
+            row = history_steps[step_id]
+            step = {
+                'step_id': row[0],
+                'step_name': row[1],
+                'run_status': row[2],
+                'run_duration': row[3],
+                'message': row[4],
+                'sql_message_id': row[5],
+                'sql_severity': row[6],
+                'command': defined_row[2],
+                'subsystem': defined_row[3],
+                'executed': True
+            }
+        elif last_step_run is not None and step_id <= last_step_run:
+            # This step ran (it's at or before the last step that ran)
+            # but doesn't have its own history record
+            # Mark as succeeded if before the failed step, or failed if it's the last step
+            if step_id == last_step_run and job_failed:
+                # This is the step that failed
+                outcome_row = history_steps[0]
                 step = {
-                    'step_id': row[0],
-                    'step_name': row[1],
-                    'run_status': row[2],
-                    'run_duration': row[3],
-                    'message': row[4],
-                    'sql_message_id': row[5],
-                    'sql_severity': row[6],
+                    'step_id': defined_row[0],
+                    'step_name': defined_row[1],
+                    'run_status': outcome_row[2],  # Failed status from job outcome
+                    'run_duration': outcome_row[3],
+                    'message': outcome_row[4],
+                    'sql_message_id': outcome_row[5],
+                    'sql_severity': outcome_row[6],
                     'command': defined_row[2],
                     'subsystem': defined_row[3],
                     'executed': True
                 }
-            elif last_step_run is not None and step_id <= last_step_run:
-                # This step ran (it's at or before the last step that ran)
-                # but doesn't have its own history record
-                # Mark as succeeded if before the failed step, or failed if it's the last step
-                if step_id == last_step_run and job_failed:
-                    # This is the step that failed
-                    outcome_row = history_steps[0]
-                    step = {
-                        'step_id': defined_row[0],
-                        'step_name': defined_row[1],
-                        'run_status': outcome_row[2],  # Failed status from job outcome
-                        'run_duration': outcome_row[3],
-                        'message': outcome_row[4],
-                        'sql_message_id': outcome_row[5],
-                        'sql_severity': outcome_row[6],
-                        'command': defined_row[2],
-                        'subsystem': defined_row[3],
-                        'executed': True
-                    }
-                else:
-                    # This step ran successfully (before the failed step)
-                    step = {
-                        'step_id': defined_row[0],
-                        'step_name': defined_row[1],
-                        'run_status': 1,  # Succeeded
-                        'run_duration': None,
-                        'message': 'Step completed successfully (no detailed history available)',
-                        'sql_message_id': None,
-                        'sql_severity': None,
-                        'command': defined_row[2],
-                        'subsystem': defined_row[3],
-                        'executed': True
-                    }
-                    step['duration_formatted'] = 'N/A'
-                    step['status_text'] = 'Succeeded'
             else:
-                # Step was not executed (job failed before reaching it)
+                # This step ran successfully (before the failed step)
                 step = {
                     'step_id': defined_row[0],
                     'step_name': defined_row[1],
-                    'run_status': None,
+                    'run_status': 1,  # Succeeded
                     'run_duration': None,
-                    'message': 'Step not executed (job failed before reaching this step)',
+                    'message': 'Step completed successfully (no detailed history available)',
                     'sql_message_id': None,
                     'sql_severity': None,
                     'command': defined_row[2],
                     'subsystem': defined_row[3],
-                    'executed': False
+                    'executed': True
                 }
                 step['duration_formatted'] = 'N/A'
-                step['status_text'] = 'Not Run'
-            
-            # Format duration for executed steps
-            if step.get('executed') and step['run_duration']:
-                duration = str(step['run_duration']).zfill(6)
-                hours = int(duration[0:2])
-                minutes = int(duration[2:4])
-                seconds = int(duration[4:6])
-                step['duration_formatted'] = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-            elif step.get('executed'):
-                step['duration_formatted'] = 'N/A'
-            
-            # Add status text for executed steps
-            if step.get('executed') and step['run_status'] is not None:
-                status_codes = {
-                    0: 'Failed',
-                    1: 'Succeeded',
-                    2: 'Retry',
-                    3: 'Canceled',
-                    4: 'In Progress'
-                }
-                step['status_text'] = status_codes.get(step['run_status'], 'Unknown')
-            
-            # Check if this is an SSIS step and extract package path
-            if step.get('command'):
-                import re
-                # Try multiple patterns for SSIS package path
-                # Pattern 1: /ISSERVER "\SSISDB\folder\project\package.dtsx" (quoted path with spaces)
-                path_match = re.search(r'/ISSERVER\s+"\\SSISDB\\([^"]+)"', step['command'], re.IGNORECASE)
-                if not path_match:
-                    # Pattern 2: /ISSERVER \SSISDB\folder\project\package.dtsx (unquoted, look for .dtsx)
-                    path_match = re.search(r'/ISSERVER\s+\\SSISDB\\([^\s]+\.dtsx)', step['command'], re.IGNORECASE)
-                if not path_match:
-                    # Pattern 3: Just look for SSISDB path anywhere with quotes
-                    path_match = re.search(r'"\\SSISDB\\([^"]+)"', step['command'], re.IGNORECASE)
-                if not path_match:
-                    # Pattern 4: SSISDB path ending with .dtsx (no quotes, no spaces)
-                    path_match = re.search(r'\\SSISDB\\([^\s]+\.dtsx)', step['command'], re.IGNORECASE)
-                
-                if path_match:
-                    step['ssis_package_path'] = path_match.group(1)
-                    step['subsystem'] = 'SSIS'  # Mark as SSIS step
-                
-                # Also check for execution_id in message
-                if step.get('message') and 'execution_id' in step['message'].lower():
-                    exec_match = re.search(r'execution_id[:\s]+(\d+)', step['message'], re.IGNORECASE)
-                    if exec_match:
-                        step['ssis_execution_id'] = int(exec_match.group(1))
-            
-            steps.append(step)
-        
-        # For SSIS steps without execution_id, try to find it based on timing
-        # Calculate job start and end times
-        # NOTE: SQL Server Agent stores times in local server time (CST)
-        # SSISDB stores times in UTC with DATETIMEOFFSET
-        # We need to convert the job times to UTC for comparison
-        job_start_time_local = None
-        job_end_time_local = None
-        
-        if run_date and run_time:
-            from datetime import datetime, timedelta
-            run_date_str = str(run_date)
-            run_time_str = str(run_time).zfill(6)
-            job_start_time_local = datetime.strptime(f"{run_date_str} {run_time_str}", "%Y%m%d %H%M%S")
-            
-            # Calculate end time from duration
-            if run_duration:
-                duration_str = str(run_duration).zfill(6)
-                hours = int(duration_str[0:2])
-                minutes = int(duration_str[2:4])
-                seconds = int(duration_str[4:6])
-                duration_delta = timedelta(hours=hours, minutes=minutes, seconds=seconds)
-                job_end_time_local = job_start_time_local + duration_delta + timedelta(minutes=2)  # Add 2 minute buffer
-        
-        # Query to find execution_id for SSIS packages based on timing
-        for step in steps:
-            if step.get('ssis_package_path') and not step.get('ssis_execution_id') and job_start_time_local and job_end_time_local:
-                # Parse package path
-                parts = step['ssis_package_path'].split('\\')
-                if len(parts) >= 3:
-                    folder_name = parts[0]
-                    project_name = parts[1]
-                    package_name = parts[2]
-                    
-                    # Match status: if step failed (run_status=0), look for failed SSIS execution (status=4)
-                    status_filter = ""
-                    if step.get('run_status') == 0:
-                        status_filter = "AND e.status = 4"  # Failed
-                    elif step.get('run_status') == 1:
-                        status_filter = "AND e.status = 7"  # Succeeded
-                    
-                    # Convert times to string format for SQL Server
-                    job_start_str = job_start_time_local.strftime("%Y-%m-%d %H:%M:%S")
-                    job_end_str = job_end_time_local.strftime("%Y-%m-%d %H:%M:%S")
-                    
-                    # Use AT TIME ZONE to convert local time to UTC for comparison with SSISDB times
-                    # SSISDB.catalog.executions.start_time is stored as DATETIMEOFFSET in UTC
-                    query_exec = f"""
-                    SELECT TOP 1 e.execution_id, e.status, FORMAT(CAST(e.start_time AS DATETIME), 'yyyy-MM-dd HH:mm:ss') as start_time
-                    FROM SSISDB.catalog.executions e
-                    WHERE e.folder_name = ?
-                    AND e.project_name = ?
-                    AND e.package_name = ?
-                    AND e.start_time >= CAST(? AS DATETIME) AT TIME ZONE 'Central Standard Time' AT TIME ZONE 'UTC'
-                    AND e.start_time <= CAST(? AS DATETIME) AT TIME ZONE 'Central Standard Time' AT TIME ZONE 'UTC'
-                    {status_filter}
-                    ORDER BY e.start_time ASC
-                    """
-                    
-                    cursor.execute(query_exec, (folder_name, project_name, package_name, job_start_str, job_end_str))
-                    exec_row = cursor.fetchone()
-                    if exec_row:
-                        step['ssis_execution_id'] = exec_row[0]
-                        step['ssis_execution_status'] = exec_row[1]
-                        step['ssis_start_time'] = str(exec_row[2]) if exec_row[2] else None
+                step['status_text'] = 'Succeeded'
+        else:
+            # Step was not executed (job failed before reaching it)
+            step = {
+                'step_id': defined_row[0],
+                'step_name': defined_row[1],
+                'run_status': None,
+                'run_duration': None,
+                'message': 'Step not executed (job failed before reaching this step)',
+                'sql_message_id': None,
+                'sql_severity': None,
+                'command': defined_row[2],
+                'subsystem': defined_row[3],
+                'executed': False
+            }
+            step['duration_formatted'] = 'N/A'
+            step['status_text'] = 'Not Run'
+    
+        # Format duration for executed steps
+        if step.get('executed') and step['run_duration']:
+            duration = str(step['run_duration']).zfill(6)
+            hours = int(duration[0:2])
+            minutes = int(duration[2:4])
+            seconds = int(duration[4:6])
+            step['duration_formatted'] = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+        elif step.get('executed'):
+            step['duration_formatted'] = 'N/A'
+    
+        # Add status text for executed steps
+        if step.get('executed') and step['run_status'] is not None:
+            status_codes = {
+                0: 'Failed',
+                1: 'Succeeded',
+                2: 'Retry',
+                3: 'Canceled',
+                4: 'In Progress'
+            }
+            step['status_text'] = status_codes.get(step['run_status'], 'Unknown')
+    
+        # Check if this is an SSIS step and extract package path
+        if step.get('command'):
+            import re
+            # Try multiple patterns for SSIS package path
+            # Pattern 1: /ISSERVER "\SSISDB\folder\project\package.dtsx" (quoted path with spaces)
+            path_match = re.search(r'/ISSERVER\s+"\\SSISDB\\([^"]+)"', step['command'], re.IGNORECASE)
+            if not path_match:
+                # Pattern 2: /ISSERVER \SSISDB\folder\project\package.dtsx (unquoted, look for .dtsx)
+                path_match = re.search(r'/ISSERVER\s+\\SSISDB\\([^\s]+\.dtsx)', step['command'], re.IGNORECASE)
+            if not path_match:
+                # Pattern 3: Just look for SSISDB path anywhere with quotes
+                path_match = re.search(r'"\\SSISDB\\([^"]+)"', step['command'], re.IGNORECASE)
+            if not path_match:
+                # Pattern 4: SSISDB path ending with .dtsx (no quotes, no spaces)
+                path_match = re.search(r'\\SSISDB\\([^\s]+\.dtsx)', step['command'], re.IGNORECASE)
+    
+            if path_match:
+                step['ssis_package_path'] = path_match.group(1)
+                step['subsystem'] = 'SSIS'  # Mark as SSIS step
+    
+            # Also check for execution_id in message
+            if step.get('message') and 'execution_id' in step['message'].lower():
+                exec_match = re.search(r'execution_id[:\s]+(\d+)', step['message'], re.IGNORECASE)
+                if exec_match:
+                    step['ssis_execution_id'] = int(exec_match.group(1))
+    
+        steps.append(step)
+    
+    # For SSIS steps without execution_id, try to find it based on timing
+    # Calculate job start and end times
+    # NOTE: SQL Server Agent stores times in local server time (CST)
+    # SSISDB stores times in UTC with DATETIMEOFFSET
+    # We need to convert the job times to UTC for comparison
+    job_start_time_local = None
+    job_end_time_local = None
+    
+    if run_date and run_time:
+        from datetime import datetime, timedelta
+        run_date_str = str(run_date)
+        run_time_str = str(run_time).zfill(6)
+        job_start_time_local = datetime.strptime(f"{run_date_str} {run_time_str}", "%Y%m%d %H%M%S")
+    
+        # Calculate end time from duration
+        if run_duration:
+            duration_str = str(run_duration).zfill(6)
+            hours = int(duration_str[0:2])
+            minutes = int(duration_str[2:4])
+            seconds = int(duration_str[4:6])
+            duration_delta = timedelta(hours=hours, minutes=minutes, seconds=seconds)
+            job_end_time_local = job_start_time_local + duration_delta + timedelta(minutes=2)  # Add 2 minute buffer
+    
+    # Query to find execution_id for SSIS packages based on timing
+    for step in steps:
+        if step.get('ssis_package_path') and not step.get('ssis_execution_id') and job_start_time_local and job_end_time_local:
+            # Parse package path
+            parts = step['ssis_package_path'].split('\\')
+            if len(parts) >= 3:
+                folder_name = parts[0]
+                project_name = parts[1]
+                package_name = parts[2]
+    
+                # Match status: if step failed (run_status=0), look for failed SSIS execution (status=4)
+                status_filter = ""
+                if step.get('run_status') == 0:
+                    status_filter = "AND e.status = 4"  # Failed
+                elif step.get('run_status') == 1:
+                    status_filter = "AND e.status = 7"  # Succeeded
+    
+                # Convert times to string format for SQL Server
+                job_start_str = job_start_time_local.strftime("%Y-%m-%d %H:%M:%S")
+                job_end_str = job_end_time_local.strftime("%Y-%m-%d %H:%M:%S")
+    
+                # Use AT TIME ZONE to convert local time to UTC for comparison with SSISDB times
+                # SSISDB.catalog.executions.start_time is stored as DATETIMEOFFSET in UTC
+                query_exec = f"""
+                SELECT TOP 1 e.execution_id, e.status, FORMAT(CAST(e.start_time AS DATETIME), 'yyyy-MM-dd HH:mm:ss') as start_time
+                FROM SSISDB.catalog.executions e
+                WHERE e.folder_name = ?
+                AND e.project_name = ?
+                AND e.package_name = ?
+                AND e.start_time >= CAST(? AS DATETIME) AT TIME ZONE 'Central Standard Time' AT TIME ZONE 'UTC'
+                AND e.start_time <= CAST(? AS DATETIME) AT TIME ZONE 'Central Standard Time' AT TIME ZONE 'UTC'
+                {status_filter}
+                ORDER BY e.start_time ASC
+                """
+    
+                cursor.execute(query_exec, (folder_name, project_name, package_name, job_start_str, job_end_str))
+                exec_row = cursor.fetchone()
+                if exec_row:
+                    step['ssis_execution_id'] = exec_row[0]
+                    step['ssis_execution_status'] = exec_row[1]
+                    step['ssis_start_time'] = str(exec_row[2]) if exec_row[2] else None
+    
+    # Debug: Include raw command in response for troubleshooting
+    for step in steps:
+        if step.get('command'):
+            step['command_preview'] = step['command'][:200] if len(step.get('command', '')) > 200 else step.get('command')
+    
+    return steps
+
+def build_job_steps(cursor, instance_ids):
+    """Build step breakdowns for several job executions with one history query, keyed by instance_id"""
+    placeholders = ', '.join('?' * len(instance_ids))
+    
+    # Job outcome and step history rows for all the executions
+    query_history_steps = f"""
+    SELECT 
+        h.instance_id,
+        j.job_id,
+        j.name as job_name,
+        h.run_date,
+        h.run_time,
+        h.step_id,
+        h.step_name,
+        h.run_status,
+        h.run_duration,
+        h.message,
+        h.sql_message_id,
+        h.sql_severity
+    FROM msdb.dbo.sysjobhistory h
+    JOIN msdb.dbo.sysjobs j ON h.job_id = j.job_id
+    WHERE h.instance_id IN ({placeholders})
+    ORDER BY h.instance_id ASC, h.step_id ASC
+    """
+    
+    cursor.execute(query_history_steps, list(instance_ids))
+    executions = {}
+    history_steps = {}
+    for row in cursor.fetchall():
+        instance_id, job_id, job_name, run_date, run_time = row[:5]
+        # Same layout as before: step_id, step_name, run_status, run_duration, message, sql_message_id, sql_severity
+        history_steps.setdefault(instance_id, {})[row[5]] = tuple(row[5:])
+        if row[5] == 0:
+            executions[instance_id] = (job_id, job_name, run_date, run_time, row[8])
+    
+    if not executions:
+        return {}
+    
+    # All defined steps for these jobs (to show steps that didn't run)
+    job_ids = sorted({execution[0] for execution in executions.values()})
+    query_defined_steps = f"""
+    SELECT 
+        s.job_id,
+        s.step_id,
+        s.step_name,
+        s.command,
+        s.subsystem
+    FROM msdb.dbo.sysjobsteps s
+    WHERE s.job_id IN ({', '.join('?' * len(job_ids))})
+    ORDER BY s.job_id ASC, s.step_id ASC
+    """
+    
+    cursor.execute(query_defined_steps, job_ids)
+    defined_steps = {}
+    for row in cursor.fetchall():
+        defined_steps.setdefault(row[0], []).append(tuple(row[1:]))
+    
+    results = {}
+    for instance_id, (job_id, job_name, run_date, run_time, run_duration) in executions.items():
+        results[instance_id] = {
+            'job_name': job_name,
+            'instance_id': instance_id,
+            'steps': build_execution_steps(cursor, history_steps[instance_id], defined_steps.get(job_id, []),
+                                           run_date, run_time, run_duration)
+        }
+    return results
+
+@app.route('/api/job/steps/<int:instance_id>')
+@with_query_deadline('job_steps')
+def get_job_steps(instance_id):
+    """Get steps for a specific job execution instance"""
+    try:
+        conn = get_db_connection()
+        cursor = open_cursor(conn)
         
+        execution = build_job_steps(cursor, [instance_id]).get(instance_id)
         conn.close()
         
-        # Debug: Include raw command in response for troubleshooting
-        for step in steps:
-            if step.get('command'):
-                step['command_preview'] = step['command'][:200] if len(step.get('command', '')) > 200 else step.get('command')
+        if not execution:
+            return jsonify({'error': 'Execution not found'}), 404
+        
+        return jsonify(execution)
+        
+    except pyodbc.OperationalError:
+        # Deadline missed or server unreachable: handled by with_query_deadline
+        raise
         
+    except Exception as e:
+        import traceback
         return jsonify({
-            'job_name': job_name,
-            'instance_id': instance_id,
-            'steps': steps
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }), 500
+
+@app.route('/api/job/steps/batch')
+@with_query_deadline('job_steps')
+def get_job_steps_batch():
+    """Get steps for several job execution instances (ids=1,2,3) in one request"""
+    try:
+        try:
+            instance_ids = [int(value) for value in request.args.get('ids', '').split(',') if value.strip()]
+        except ValueError:
+            return jsonify({'error': 'ids must be a comma-separated list of instance ids'}), 400
+        
+        instance_ids = list(dict.fromkeys(instance_ids))
+        if not instance_ids:
+            return jsonify({'error': 'ids required'}), 400
+        if len(instance_ids) > MAX_BATCH_INSTANCES:
+            return jsonify({'error': f'At most {MAX_BATCH_INSTANCES} instance ids per request'}), 400
+        
+        conn = get_db_connection()
+        cursor = open_cursor(conn)
+        
+        executions = build_job_steps(cursor, instance_ids)
+        conn.close()
+        
+        return jsonify({
+            'executions': [executions[instance_id] for instance_id in instance_ids if instance_id in executions],
+            'not_found': [instance_id for instance_id in instance_ids if instance_id not in executions]
         })
         
+    except pyodbc.OperationalError:
+        # Deadline missed or server unreachable: handled by with_query_deadline
+        raise
+        
     except Exception as e:
         import traceback
         return jsonify({
@@ -785,10 +1567,11 @@ def get_job_steps(instance_id):
         }), 500
 
 @app.route('/api/job/history/<job_name>')
+@with_query_deadline('job_history')
 def get_job_history(job_name):
     try:
         conn = get_db_connection()
-        cursor = conn.cursor()
+        cursor = open_cursor(conn)
         
         query = """
         SELECT 
@@ -809,40 +1592,19 @@ def get_job_history(job_name):
         """
         
         cursor.execute(query, job_name)
-        columns = [column[0] for column in cursor.description]
         history = []
         
-        for row in cursor.fetchall():
-            record = dict(zip(columns, row))
-            
-            # Format run date and time
-            run_date = str(record['run_date'])
-            run_time = str(record['run_time']).zfill(6)
-            record['run_timestamp'] = f"{run_date[:4]}-{run_date[4:6]}-{run_date[6:]} {run_time[:2]}:{run_time[2:4]}:{run_time[4:6]}"
-            
-            # Format duration
-            if record['run_duration']:
-                duration = str(record['run_duration']).zfill(6)
-                hours = int(duration[0:2])
-                minutes = int(duration[2:4])
-                seconds = int(duration[4:6])
-                record['duration_formatted'] = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-            else:
-                record['duration_formatted'] = 'N/A'
-            
-            # Add status text
-            status_codes = {
-                0: 'Failed',
-                1: 'Succeeded',
-                2: 'Retry',
-                3: 'Canceled',
-                4: 'In Progress'
-            }
-            record['status_text'] = status_codes.get(record.get('run_status'), 'Unknown')
+        while True:
+            batch = cursor.fetchmany(ROW_FETCH_SIZE)
+            if not batch:
+                break
+            history.extend(JobHistoryRow(row) for row in batch)
             
-            history.append(record)
-            
-        return jsonify(history)
+        return json_response(history)
+        
+    except pyodbc.OperationalError:
+        # Deadline missed or server unreachable: handled by with_query_deadline
+        raise
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -851,5 +1613,737 @@ def get_job_history(job_name):
         if 'conn' in locals():
             conn.close()
 
+@app.route('/api/timeline')
+@with_query_deadline('timeline')
+def get_timeline():
+    """Get job runs overlapping a time window and the peak concurrency per server"""
+    try:
+        # History to index (default and maximum 30 days) and the window to inspect within it
+        days = request.args.get('days', MAX_TIMELINE_DAYS, type=int)
+        start = request.args.get('start', '')
+        end = request.args.get('end', '')
+        limit = max(1, min(request.args.get('limit', DEFAULT_TIMELINE_LIMIT, type=int), MAX_TIMELINE_LIMIT))
+        offset = max(0, request.args.get('offset', 0, type=int))
+
+        try:
+            window_start = datetime.strptime(start, "%Y-%m-%d %H:%M:%S") if start else None
+            window_end = datetime.strptime(end, "%Y-%m-%d %H:%M:%S") if end else None
+        except ValueError:
+            return jsonify({'error': 'start and end must use the format YYYY-MM-DD HH:MM:SS'}), 400
+
+        conn = get_db_connection()
+        cursor = open_cursor(conn)
+        index = get_timeline_index(cursor, days)
+        running = get_running_runs(cursor)
+
+        # Without bounds, inspect the last hour (or the hour before `end`)
+        if window_end is None:
+            window_end = datetime.now()
+        if window_start is None:
+            window_start = window_end - DEFAULT_TIMELINE_WINDOW
+        if window_end <= window_start:
+            return jsonify({'error': 'end must be after start'}), 400
+
+        runs = overlapping_runs(index, running, window_start, window_end)
+        peaks = index.peak_concurrency(runs, window_start, window_end)
+
+        return jsonify({
+            'window_start': window_start.strftime("%Y-%m-%d %H:%M:%S"),
+            'window_end': window_end.strftime("%Y-%m-%d %H:%M:%S"),
+            'run_count': len(runs),
+            'offset': offset,
+            'limit': limit,
+            'servers': {
+                server: {
+                    'peak_concurrency': peak['peak_concurrency'],
+                    'peak_time': peak['peak_time'].strftime("%Y-%m-%d %H:%M:%S") if peak['peak_time'] else None
+                }
+                for server, peak in peaks.items()
+            },
+            'runs': [format_timeline_run(run) for run in runs[offset:offset + limit]]
+        })
+
+    except pyodbc.OperationalError:
+        # Deadline missed or server unreachable: handled by with_query_deadline
+        raise
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    finally:
+        if 'conn' in locals():
+            conn.close()
+
+@app.route('/api/timeline/<int:instance_id>')
+@with_query_deadline('timeline')
+def get_co_running_jobs(instance_id):
+    """Get the job runs that overlapped a specific job execution"""
+    try:
+        days = request.args.get('days', MAX_TIMELINE_DAYS, type=int)
+
+        conn = get_db_connection()
+        cursor = open_cursor(conn)
+        index = get_timeline_index(cursor, days)
+
+        run = index.runs_by_id.get(instance_id)
+        if run is None:
+            return jsonify({'error': 'Execution not found in the indexed window'}), 404
+        others = [other for other in overlapping_runs(index, get_running_runs(cursor), run['start'], run['end'])
+                  if other is not run]
+
+        return jsonify({
+            'run': format_timeline_run(run),
+            'co_running': [format_timeline_run(other) for other in others]
+        })
+
+    except pyodbc.OperationalError:
+        # Deadline missed or server unreachable: handled by with_query_deadline
+        raise
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    finally:
+        if 'conn' in locals():
+            conn.close()
+
+# Output columns and types for each export kind, in query column order
+EXPORT_COLUMNS = {
+    'jobs': [
+        ('instance_id', 'int'), ('job_name', 'str'), ('category_name', 'str'), ('server', 'str'),
+        ('run_status', 'int'), ('status_text', 'str'), ('start_time', 'datetime'),
+        ('end_time', 'datetime'), ('duration_seconds', 'int'), ('message', 'str')
+    ],
+    'steps': [
+        ('instance_id', 'int'), ('job_name', 'str'), ('category_name', 'str'), ('server', 'str'),
+        ('step_id', 'int'), ('step_name', 'str'), ('run_status', 'int'), ('status_text', 'str'),
+        ('start_time', 'datetime'), ('end_time', 'datetime'), ('duration_seconds', 'int'),
+        ('sql_message_id', 'int'), ('sql_severity', 'int'), ('message', 'str')
+    ],
+    'ssis': [
+        ('execution_id', 'int'), ('folder_name', 'str'), ('project_name', 'str'),
+        ('package_name', 'str'), ('status', 'int'), ('status_text', 'str'),
+        ('start_time', 'datetime'), ('end_time', 'datetime'), ('duration_seconds', 'int')
+    ]
+}
+
+# sysjobhistory run_date/run_time/run_duration decoded on the server, so rows
+# can be written out without a per-row Python conversion
+RUN_START_SQL = ("DATETIMEFROMPARTS(h.run_date / 10000, h.run_date / 100 % 100, h.run_date % 100, "
+                 "h.run_time / 10000, h.run_time / 100 % 100, h.run_time % 100, 0)")
+RUN_DURATION_SQL = "(h.run_duration / 10000 * 3600 + h.run_duration / 100 % 100 * 60 + h.run_duration % 100)"
+RUN_END_SQL = f"DATEADD(SECOND, {RUN_DURATION_SQL}, {RUN_START_SQL})"
+# SQL Agent history is recorded in the server's local time (Central); SSISDB times
+# carry an offset and are converted to this zone so all export kinds share one clock
+SERVER_TIME_ZONE = 'Central Standard Time'
+JOB_STATUS_TEXT_SQL = """CASE h.run_status
+                WHEN 0 THEN 'Failed'
+                WHEN 1 THEN 'Succeeded'
+                WHEN 2 THEN 'Retry'
+                WHEN 3 THEN 'Canceled'
+                WHEN 4 THEN 'In Progress'
+                ELSE 'Unknown'
+            END"""
+
+def stream_export_csv(kind, batches):
+    """Yield CSV text one fetched batch at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in EXPORT_COLUMNS[kind]])
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+def stream_export_parquet(kind, batches, sock=None):
+    """Write each fetched batch as a Parquet row group in a temporary file, then stream the file"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrow_types = {'int': pa.int64(), 'str': pa.string(), 'datetime': pa.timestamp('s')}
+    columns = [(name, arrow_types[column_type]) for name, column_type in EXPORT_COLUMNS[kind]]
+    schema = pa.schema(columns)
+
+    # The Parquet footer is written last, so the file is staged on disk to keep memory flat
+    with tempfile.TemporaryFile() as staging:
+        writer = pq.ParquetWriter(staging, schema)
+        try:
+            for rows in batches:
+                if sock is not None and is_socket_closed(sock):
+                    batches.close()
+                    return
+                arrays = [pa.array(values, type=arrow_type)
+                          for values, (_, arrow_type) in zip(zip(*rows), columns)]
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+        finally:
+            writer.close()
+
+        staging.seek(0)
+        while True:
+            chunk = staging.read(1024 * 1024)
+            if not chunk:
+                break
+            yield chunk
+
+@app.route('/api/timeline/running')
+@with_query_deadline('timeline')
+def get_running_co_running_jobs():
+    """Get each job that is still running with the job runs overlapping it so far"""
+    try:
+        days = request.args.get('days', MAX_TIMELINE_DAYS, type=int)
+
+        conn = get_db_connection()
+        cursor = open_cursor(conn)
+        index = get_timeline_index(cursor, days)
+        running = get_running_runs(cursor)
+
+        return jsonify([{
+            'run': format_timeline_run(run),
+            'co_running': [format_timeline_run(other)
+                           for other in overlapping_runs(index, running, run['start'], run['end'])
+                           if other is not run]
+        } for run in running])
+
+    except pyodbc.OperationalError:
+        # Deadline missed or server unreachable: handled by with_query_deadline
+        raise
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    finally:
+        if 'conn' in locals():
+            conn.close()
+
+@app.route('/api/export')
+def export_history():
+    """Stream job outcomes, job steps or SSIS executions for a date range as CSV or Parquet"""
+    kind = request.args.get('kind', 'jobs').lower()
+    output_format = request.args.get('format', 'csv').lower()
+    category = request.args.get('category', '')
+
+    if kind not in EXPORT_COLUMNS:
+        return jsonify({'error': 'kind must be one of: jobs, steps, ssis'}), 400
+    if output_format not in ('csv', 'parquet'):
+        return jsonify({'error': 'format must be csv or parquet'}), 400
+
+    try:
+        today = datetime.now().date()
+        start_date = datetime.strptime(request.args['start'], "%Y-%m-%d").date() if request.args.get('start') else today - timedelta(days=6)
+        end_date = datetime.strptime(request.args['end'], "%Y-%m-%d").date() if request.args.get('end') else today
+    except ValueError:
+        return jsonify({'error': 'start and end must use the format YYYY-MM-DD'}), 400
+    if end_date < start_date:
+        return jsonify({'error': 'end must not be before start'}), 400
+
+    if output_format == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            return jsonify({'error': 'Parquet export requires the pyarrow package'}), 501
+
+    if not db_circuit_breaker.allow_request():
+        return jsonify({'error': 'Database circuit breaker is open'}), 503
+
+    # Category filter applies to SQL Agent history; SSIS executions have no job category
+    category_filter = "AND c.name = ?" if category and kind != 'ssis' else ""
+
+    def as_time(expression):
+        # Parquet keeps real timestamps; CSV gets the text form straight from the server
+        return expression if output_format == 'parquet' else f"CONVERT(VARCHAR(19), {expression}, 120)"
+
+    if kind == 'jobs':
+        query = f"""
+        SELECT
+            h.instance_id,
+            j.name as job_name,
+            c.name as category_name,
+            h.server,
+            h.run_status,
+            {JOB_STATUS_TEXT_SQL} as status_text,
+            {as_time(RUN_START_SQL)} as start_time,
+            {as_time(RUN_END_SQL)} as end_time,
+            {RUN_DURATION_SQL} as duration_seconds,
+            h.message
+        FROM msdb.dbo.sysjobhistory h
+        INNER JOIN msdb.dbo.sysjobs j ON h.job_id = j.job_id
+        INNER JOIN msdb.dbo.syscategories c ON j.category_id = c.category_id
+        WHERE h.step_id = 0
+        AND h.run_date BETWEEN ? AND ?
+        {category_filter}
+        ORDER BY h.instance_id
+        """
+    elif kind == 'steps':
+        query = f"""
+        SELECT
+            h.instance_id,
+            j.name as job_name,
+            c.name as category_name,
+            h.server,
+            h.step_id,
+            h.step_name,
+            h.run_status,
+            {JOB_STATUS_TEXT_SQL} as status_text,
+            {as_time(RUN_START_SQL)} as start_time,
+            {as_time(RUN_END_SQL)} as end_time,
+            {RUN_DURATION_SQL} as duration_seconds,
+            h.sql_message_id,
+            h.sql_severity,
+            h.message
+        FROM msdb.dbo.sysjobhistory h
+        INNER JOIN msdb.dbo.sysjobs j ON h.job_id = j.job_id
+        INNER JOIN msdb.dbo.syscategories c ON j.category_id = c.category_id
+        WHERE h.step_id > 0
+        AND h.run_date BETWEEN ? AND ?
+        {category_filter}
+        ORDER BY h.instance_id
+        """
+    else:
+        query = f"""
+        SELECT
+            e.execution_id,
+            e.folder_name,
+            e.project_name,
+            e.package_name,
+            e.status,
+            CASE e.status
+                WHEN 1 THEN 'Created'
+                WHEN 2 THEN 'Running'
+                WHEN 3 THEN 'Canceled'
+                WHEN 4 THEN 'Failed'
+                WHEN 5 THEN 'Pending'
+                WHEN 6 THEN 'Ended Unexpectedly'
+                WHEN 7 THEN 'Succeeded'
+                WHEN 8 THEN 'Stopping'
+                WHEN 9 THEN 'Completed'
+                ELSE 'Unknown'
+            END as status_text,
+            {as_time(f"CAST(e.start_time AT TIME ZONE '{SERVER_TIME_ZONE}' AS DATETIME2(0))")} as start_time,
+            {as_time(f"CAST(e.end_time AT TIME ZONE '{SERVER_TIME_ZONE}' AS DATETIME2(0))")} as end_time,
+            DATEDIFF(SECOND, e.start_time, e.end_time) as duration_seconds
+        FROM SSISDB.catalog.executions e
+        WHERE e.start_time >= CAST(? AS DATETIME) AT TIME ZONE '{SERVER_TIME_ZONE}' AT TIME ZONE 'UTC'
+        AND e.start_time < DATEADD(DAY, 1, CAST(? AS DATETIME)) AT TIME ZONE '{SERVER_TIME_ZONE}' AT TIME ZONE 'UTC'
+        ORDER BY e.execution_id
+        """
+
+    if kind == 'ssis':
+        # YYYYMMDD converts to DATETIME the same way under every DATEFORMAT setting
+        params = [start_date.strftime("%Y%m%d"), end_date.strftime("%Y%m%d")]
+    else:
+        # run_date is an integer YYYYMMDD, so the range predicate stays sargable
+        params = [int(start_date.strftime("%Y%m%d")), int(end_date.strftime("%Y%m%d"))]
+    if category_filter:
+        params.append(category)
+
+    try:
+        g.query_timeout = ENDPOINT_QUERY_TIMEOUTS['export']
+        conn = get_db_connection()
+        cursor = open_cursor(conn)
+        cursor.execute(query, params)
+    except pyodbc.OperationalError as e:
+        db_circuit_breaker.record_failure()
+        if 'conn' in locals():
+            conn.close()
+        return jsonify({'error': str(e)}), 504
+    except Exception as e:
+        if 'conn' in locals():
+            conn.close()
+        return jsonify({'error': str(e)}), 500
+    db_circuit_breaker.record_success()
+
+    def batches():
+        finished = False
+        try:
+            while True:
+                rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+                if not rows:
+                    finished = True
+                    return
+                yield rows
+        finally:
+            # The client went away mid-export: stop the server-side query too
+            if not finished:
+                try:
+                    cursor.cancel()
+                except pyodbc.Error:
+                    pass
+            conn.close()
+
+    filename = f"{kind}_{start_date:%Y%m%d}_{end_date:%Y%m%d}.{output_format}"
+    if output_format == 'csv':
+        body = stream_export_csv(kind, batches())
+        mimetype = 'text/csv'
+    else:
+        body = stream_export_parquet(kind, batches(), client_socket())
+        mimetype = 'application/vnd.apache.parquet'
+
+    return Response(body, mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename={filename}'
+    })
+
+@app.route('/api/diagnostics/queries', methods=['GET', 'DELETE'])
+def get_query_diagnostics():
+    """Get SQL Server logical reads and CPU/elapsed time per endpoint and query (DELETE resets them)"""
+    if request.method == 'DELETE':
+        with _query_statistics_lock:
+            _query_statistics.clear()
+        return jsonify({'status': 'reset'})
+
+    endpoints = {}
+    with _query_statistics_lock:
+        for endpoint, queries in _query_statistics.items():
+            # Most expensive queries first
+            query_list = sorted((dict(stats, tables=dict(stats['tables'])) for stats in queries.values()),
+                                key=lambda stats: stats['logical_reads'], reverse=True)
+            for stats in query_list:
+                stats['avg_logical_reads'] = round(stats['logical_reads'] / stats['executions'])
+                stats['avg_elapsed_ms'] = round(stats['elapsed_ms'] / stats['executions'], 1)
+                stats['client_ms'] = round(stats['client_ms'], 1)
+            endpoints[endpoint] = {
+                'logical_reads': sum(stats['logical_reads'] for stats in query_list),
+                'cpu_ms': sum(stats['cpu_ms'] for stats in query_list),
+                'elapsed_ms': sum(stats['elapsed_ms'] for stats in query_list),
+                'queries': query_list
+            }
+
+    return jsonify({
+        'enabled': QUERY_DIAGNOSTICS,
+        'endpoints': endpoints
+    })
+
+class AlertRule:
+    """One alert rule from ALERT_RULES_FILE: failed, duration or missed, optionally narrowed to a job or category"""
+
+    TYPES = ('failed', 'duration', 'missed')
+
+    def __init__(self, config):
+        self.type = config.get('type')
+        if self.type not in self.TYPES:
+            raise ValueError(f"Unknown alert rule type: {self.type!r}")
+        self.name = config.get('name', self.type)
+        self.job = config.get('job')
+        self.category = config.get('category')
+        self.percentile = float(config.get('percentile', 95))
+        self.min_runs = int(config.get('min_runs', 10))
+        self.min_seconds = int(config.get('min_seconds', 60))
+        self.minutes = float(config['minutes']) if config.get('minutes') else None
+        if self.type == 'missed' and not (self.minutes and (self.job or self.category)):
+            raise ValueError(f"Alert rule {self.name!r} needs 'minutes' and a 'job' or 'category'")
+
+    def matches(self, job_name, category_name):
+        return ((self.job is None or self.job == job_name) and
+                (self.category is None or self.category == category_name))
+
+    def to_dict(self):
+        rule = {'name': self.name, 'type': self.type, 'job': self.job, 'category': self.category}
+        if self.type == 'duration':
+            rule.update(percentile=self.percentile, min_runs=self.min_runs, min_seconds=self.min_seconds)
+        elif self.type == 'missed':
+            rule['minutes'] = self.minutes
+        return rule
+
+def load_alert_rules(path):
+    """Load alert rules from a JSON list, falling back to alerting on every failure"""
+    if not os.path.exists(path):
+        return [AlertRule({'type': 'failed'})]
+    with open(path, encoding='utf-8') as rules_file:
+        return [AlertRule(config) for config in json.load(rules_file)]
+
+class FileAlertSink:
+    """Appends each alert as one JSON line"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, alert):
+        with open(self.path, 'a', encoding='utf-8') as alert_file:
+            alert_file.write(json.dumps(alert) + '\n')
+
+class WebhookAlertSink:
+    """POSTs each alert as JSON to a URL"""
+
+    def __init__(self, url, timeout=10):
+        if not url:
+            raise ValueError("ALERT_WEBHOOK_URL is required for the webhook alert sink")
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, alert):
+        req = urllib.request.Request(self.url, data=json.dumps(alert).encode('utf-8'),
+                                     headers={'Content-Type': 'application/json'}, method='POST')
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            resp.read()
+
+ALERT_SINK_TYPES = {
+    'file': lambda: FileAlertSink(ALERT_FILE),
+    'webhook': lambda: WebhookAlertSink(ALERT_WEBHOOK_URL),
+}
+
+def build_alert_sinks(names):
+    """Create the sinks named in a comma-separated ALERT_SINKS value"""
+    sinks = []
+    for name in filter(None, (name.strip() for name in names.split(','))):
+        if name not in ALERT_SINK_TYPES:
+            raise ValueError(f"Unknown alert sink: {name!r} (expected one of {', '.join(ALERT_SINK_TYPES)})")
+        sinks.append(ALERT_SINK_TYPES[name]())
+    return sinks
+
+class AlertEngine:
+    """Evaluates the alert rules against new sysjobhistory job outcomes and sends the alerts that fire"""
+
+    def __init__(self, rules, sinks, suppress_seconds):
+        self.rules = rules
+        self.sinks = sinks
+        self.suppress_seconds = suppress_seconds
+        self.last_instance_id = None
+        self.last_check = None
+        self.last_error = None
+        self.suppressed = 0
+        self.recent = deque(maxlen=ALERT_HISTORY_SIZE)
+        self._durations = {}      # job name -> (recent durations in order, same durations sorted)
+        self._last_runs = {}      # job name -> (category name, end of last run)
+        self._last_fired = {}     # (rule name, job name) -> time.time() of last alert
+        self._missed = set()      # (rule name, job name) already reported as missed
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def check(self, cursor):
+        """Evaluate the rules against the rows added since the last check and return new alerts"""
+        with self._lock:
+            seeding = self.last_instance_id is None
+            if seeding:
+                # Pin the watermark first so rows written during the seed are picked up next time
+                watermark = get_history_version(cursor)
+                self._durations.clear()
+                self._last_runs.clear()
+                condition = "h.run_date >= CONVERT(VARCHAR(8), DATEADD(day, -?, GETDATE()), 112) AND h.instance_id <= ?"
+                params = (ALERT_BASELINE_DAYS, watermark)
+            else:
+                watermark = self.last_instance_id
+                condition, params = "h.instance_id > ?", (self.last_instance_id,)
+
+            query = f"""
+            SELECT
+                h.instance_id,
+                j.name as job_name,
+                c.name as category_name,
+                h.run_status,
+                h.run_date,
+                h.run_time,
+                h.run_duration,
+                h.message
+            FROM msdb.dbo.sysjobhistory h
+            INNER JOIN msdb.dbo.sysjobs j ON h.job_id = j.job_id
+            INNER JOIN msdb.dbo.syscategories c ON j.category_id = c.category_id
+            WHERE h.step_id = 0
+            AND {condition}
+            ORDER BY h.instance_id
+            """
+            cursor.execute(query, *params)
+
+            alerts = []
+            while True:
+                batch = cursor.fetchmany(ROW_FETCH_SIZE)
+                if not batch:
+                    break
+                for row in batch:
+                    if not seeding:
+                        alerts.extend(self._evaluate_run(row))
+                    self._record_run(row)
+                    watermark = max(watermark, row[0])
+
+            # Only advanced once every row was read, so a failed check is retried in full
+            self.last_instance_id = watermark
+            missed = self._evaluate_missed()
+            if not seeding:
+                # Jobs already overdue at startup are marked as reported without alerting,
+                # so a restart does not re-send them
+                alerts.extend(missed)
+            self.last_check = datetime.now()
+            return self._fire(alerts)
+
+    def _record_run(self, row):
+        instance_id, job_name, category_name, run_status, run_date, run_time, run_duration, message = row
+        start = parse_run_datetime(run_date, run_time)
+        if start is None:
+            return
+        duration = run_duration_seconds(run_duration)
+        self._last_runs[job_name] = (category_name, start + timedelta(seconds=duration))
+        for rule in self.rules:
+            self._missed.discard((rule.name, job_name))
+
+        if run_status == 1:
+            recent, ordered = self._durations.setdefault(job_name, (deque(), []))
+            recent.append(duration)
+            insort(ordered, duration)
+            if len(recent) > ALERT_BASELINE_RUNS:
+                del ordered[bisect_left(ordered, recent.popleft())]
+
+    def _evaluate_run(self, row):
+        instance_id, job_name, category_name, run_status, run_date, run_time, run_duration, message = row
+        start = parse_run_datetime(run_date, run_time)
+        alerts = []
+        for rule in self.rules:
+            if not rule.matches(job_name, category_name):
+                continue
+            if rule.type == 'failed' and run_status == 0:
+                alerts.append(self._alert(rule, job_name, category_name, instance_id, start,
+                                          f"Job '{job_name}' failed: {message}"))
+            elif rule.type == 'duration' and run_status == 1:
+                duration = run_duration_seconds(run_duration)
+                ordered = self._durations.get(job_name, (None, []))[1]
+                if duration < rule.min_seconds or len(ordered) < rule.min_runs:
+                    continue
+                # Nearest-rank percentile of the runs before this one
+                baseline = ordered[max(math.ceil(rule.percentile / 100 * len(ordered)) - 1, 0)]
+                if duration > baseline:
+                    alerts.append(self._alert(rule, job_name, category_name, instance_id, start,
+                                              f"Job '{job_name}' took {format_duration_seconds(duration)}, "
+                                              f"above its p{rule.percentile:g} of {format_duration_seconds(baseline)}"))
+        return alerts
+
+    def _evaluate_missed(self):
+        now = datetime.now()
+        alerts = []
+        for rule in self.rules:
+            if rule.type != 'missed':
+                continue
+            for job_name, (category_name, last_end) in self._last_runs.items():
+                key = (rule.name, job_name)
+                if key in self._missed or not rule.matches(job_name, category_name):
+                    continue
+                if now - last_end > timedelta(minutes=rule.minutes):
+                    # Reported once until the job runs again
+                    self._missed.add(key)
+                    alerts.append(self._alert(rule, job_name, category_name, None, last_end,
+                                              f"Job '{job_name}' has not run since {last_end:%Y-%m-%d %H:%M:%S}"))
+        return alerts
+
+    def _alert(self, rule, job_name, category_name, instance_id, run_time, message):
+        return {
+            'rule': rule.name,
+            'type': rule.type,
+            'job_name': job_name,
+            'category_name': category_name,
+            'instance_id': instance_id,
+            'run_time': run_time.strftime("%Y-%m-%d %H:%M:%S") if run_time else None,
+            'message': message
+        }
+
+    def _fire(self, alerts):
+        fired = []
+        now = time.time()
+        for alert in alerts:
+            key = (alert['rule'], alert['job_name'])
+            if now - self._last_fired.get(key, float('-inf')) < self.suppress_seconds:
+                self.suppressed += 1
+                continue
+            self._last_fired[key] = now
+            alert['id'] = self._next_id
+            alert['fired_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self._next_id += 1
+            for sink in self.sinks:
+                try:
+                    sink.send(alert)
+                except Exception as e:
+                    # One broken sink must not stop the others or the monitor
+                    app.logger.warning("Alert sink %s failed: %s", type(sink).__name__, e)
+            self.recent.append(alert)
+            fired.append(alert)
+        return fired
+
+def format_duration_seconds(seconds):
+    """Format a number of seconds as HH:MM:SS"""
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+# Built on first use, so a bad alert configuration only matters when alerting is enabled
+_alert_engine = None
+_alert_engine_lock = threading.Lock()
+
+def get_alert_engine():
+    """Return the alert engine, building it from the alert settings on first use"""
+    global _alert_engine
+    with _alert_engine_lock:
+        if _alert_engine is None:
+            _alert_engine = AlertEngine(
+                load_alert_rules(ALERT_RULES_FILE),
+                build_alert_sinks(ALERT_SINKS),
+                ALERT_SUPPRESS_MINUTES * 60
+            )
+        return _alert_engine
+
+def run_alert_check():
+    """Run one alert check on its own connection, honouring the circuit breaker"""
+    alert_engine = get_alert_engine()
+    if not db_circuit_breaker.allow_request():
+        alert_engine.last_error = 'Database circuit breaker is open'
+        return []
+    try:
+        conn = get_db_connection()
+        try:
+            alerts = alert_engine.check(open_cursor(conn))
+        finally:
+            conn.close()
+    except pyodbc.OperationalError as e:
+        db_circuit_breaker.record_failure()
+        alert_engine.last_error = str(e)
+        raise
+    db_circuit_breaker.record_success()
+    alert_engine.last_error = None
+    return alerts
+
+def alert_monitor_loop():
+    while True:
+        try:
+            run_alert_check()
+        except Exception as e:
+            if _alert_engine is not None:
+                _alert_engine.last_error = str(e)
+            app.logger.warning("Alert check failed: %s", e)
+        time.sleep(ALERT_CHECK_INTERVAL)
+
+def start_alert_monitor():
+    """Start the background alert checks (call once per process when not using __main__)"""
+    thread = threading.Thread(target=alert_monitor_loop, name='alert-monitor', daemon=True)
+    thread.start()
+    return thread
+
+@app.route('/api/alerts')
+def get_alerts():
+    """Get the alert rules, monitor state and most recent alerts"""
+    if not ALERTS_ENABLED:
+        return jsonify({'enabled': False, 'alerts': []})
+    try:
+        alert_engine = get_alert_engine()
+    except Exception as e:
+        return jsonify({'enabled': True, 'error': f'Invalid alert configuration: {e}'}), 500
+
+    return jsonify({
+        'enabled': True,
+        'rules': [rule.to_dict() for rule in alert_engine.rules],
+        'sinks': [type(sink).__name__ for sink in alert_engine.sinks],
+        'last_instance_id': alert_engine.last_instance_id,
+        'last_check': alert_engine.last_check.strftime("%Y-%m-%d %H:%M:%S") if alert_engine.last_check else None,
+        'last_error': alert_engine.last_error,
+        'suppressed': alert_engine.suppressed,
+        'alerts': list(reversed(alert_engine.recent))
+    })
+
+@app.route('/api/alerts/check', methods=['POST'])
+def check_alerts():
+    """Evaluate the alert rules now and return the alerts that fired"""
+    if not ALERTS_ENABLED:
+        return jsonify({'error': 'Alerts are disabled (set ALERTS_ENABLED=true)'}), 409
+    try:
+        return jsonify(run_alert_check())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 if __name__ == '__main__':
+    # The debug reloader runs this file twice; only the serving child checks alerts
+    if ALERTS_ENABLED and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_alert_monitor()
     app.run(debug=True)
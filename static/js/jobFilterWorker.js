@@ -0,0 +1,91 @@
+// Filters the job list off the main thread so typing in the search box
+// stays responsive on large windows. Per-category counts come from
+// /api/categories instead.
+//
+// Messages in:
+//   { type: 'load', jobs: [{ job_name, category_name, run_status }, ...] }
+//   { type: 'filter', id, category, searchTerm, showOnlyFailed }
+// Messages out:
+//   { type: 'filtered', id, indices: Int32Array, failedCount, succeededCount, totalCount }
+
+let names = [];              // lowercased job names, by row index
+let statuses = new Int8Array(0);
+let rowsByCategory = new Map();  // category name -> Int32Array of row indices
+let allRows = new Int32Array(0);
+
+self.onmessage = function(e) {
+    const msg = e.data;
+    if (msg.type === 'load') {
+        buildIndex(msg.jobs);
+    } else if (msg.type === 'filter') {
+        const result = filterRows(msg);
+        // Hand the index buffer over instead of copying it
+        self.postMessage(result, [result.indices.buffer]);
+    }
+};
+
+function buildIndex(jobs) {
+    const count = jobs.length;
+    const byCategory = new Map();
+
+    names = new Array(count);
+    statuses = new Int8Array(count);
+    allRows = new Int32Array(count);
+
+    for (let i = 0; i < count; i++) {
+        const job = jobs[i];
+        // run_status is 0-4; anything else (null) is stored as -1
+        const status = job.run_status === null || job.run_status === undefined ? -1 : job.run_status;
+
+        names[i] = (job.job_name || '').toLowerCase();
+        statuses[i] = status;
+        allRows[i] = i;
+
+        let rows = byCategory.get(job.category_name);
+        if (!rows) {
+            rows = [];
+            byCategory.set(job.category_name, rows);
+        }
+        rows.push(i);
+    }
+
+    rowsByCategory = new Map();
+    byCategory.forEach(function(rows, category) {
+        rowsByCategory.set(category, Int32Array.from(rows));
+    });
+}
+
+// Single pass over the candidate rows: the display set and the stats set
+// (which ignores "show only failed") are built together.
+function filterRows(msg) {
+    const candidates = msg.category ? (rowsByCategory.get(msg.category) || new Int32Array(0)) : allRows;
+    const searchTerm = msg.searchTerm;
+    const matches = new Int32Array(candidates.length);
+    let matchCount = 0;
+    let failedCount = 0;
+    let succeededCount = 0;
+    let totalCount = 0;
+
+    for (let i = 0; i < candidates.length; i++) {
+        const row = candidates[i];
+        if (searchTerm && names[row].indexOf(searchTerm) === -1) continue;
+
+        const status = statuses[row];
+        totalCount++;
+        if (status === 0) failedCount++;
+        else if (status === 1) succeededCount++;
+
+        if (!msg.showOnlyFailed || status === 0) {
+            matches[matchCount++] = row;
+        }
+    }
+
+    return {
+        type: 'filtered',
+        id: msg.id,
+        indices: matches.slice(0, matchCount),
+        failedCount: failedCount,
+        succeededCount: succeededCount,
+        totalCount: totalCount
+    };
+}
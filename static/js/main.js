@@ -9,6 +9,22 @@ let soundEnabled = true;
 let previousFailedCount = 0;
 let darkMode = localStorage.getItem('darkMode') === 'true';
 
+// Filtering and counting run in a worker over an indexed copy of allJobs
+const filterWorker = new Worker('/static/js/jobFilterWorker.js');
+let filterRequestId = 0;
+let filteredIndices = new Int32Array(0);
+// A freshly loaded job list, held back until the worker has filtered it so
+// filteredIndices never points into the wrong array
+let pendingJobs = null;
+
+// Rendered job rows keyed by instance_id, reused across pages and refreshes
+const jobRowCache = new Map();
+
+// Step expansions requested close together are fetched in one batch request
+const maxStepBatch = 100;
+let pendingStepLoads = [];
+let stepLoadTimer = null;
+
 $(document).ready(function() {
     // Initialize dark mode
     if (darkMode) {
@@ -48,6 +64,7 @@ $(document).ready(function() {
     
     // Refresh button
     $('#refreshBtn').on('click', function() {
+        loadCategories();
         loadJobs();
         loadStats();
     });
@@ -63,6 +80,7 @@ $(document).ready(function() {
     $('#daysFilter').on('change', function() {
         selectedDays = parseInt($(this).val());
         currentPage = 1;
+        loadCategories();
         loadJobs();
         loadStats();
     });
@@ -78,6 +96,46 @@ $(document).ready(function() {
         currentPage = 1;
         filterAndDisplayJobs();
     });
+    
+    // View/Hide steps (delegated so reused rows keep working)
+    $('#jobsContainer').on('click', '.load-history', function() {
+        const instanceId = $(this).data('instance-id');
+        const historyContainer = $(this).closest('.card-body').find('.history-container');
+        
+        if (historyContainer.is(':visible')) {
+            historyContainer.slideUp();
+            $(this).html('<i class="bi bi-list-ul"></i> View Steps');
+        } else {
+            loadJobSteps(instanceId, historyContainer, $(this));
+            $(this).html('<i class="bi bi-chevron-up"></i> Hide Steps');
+        }
+    });
+    
+    // Expand steps for every row on the current page (fetched as one batch)
+    $('#expandAllSteps').on('click', function() {
+        $('#jobsContainer .load-history').each(function() {
+            const historyContainer = $(this).closest('.card-body').find('.history-container');
+            if (!historyContainer.is(':visible')) {
+                loadJobSteps($(this).data('instance-id'), historyContainer, $(this));
+            }
+        });
+    });
+    
+    filterWorker.onmessage = function(e) {
+        const msg = e.data;
+        if (msg.type === 'filtered' && msg.id === filterRequestId) {
+            // Ignore results for filters that were superseded while the worker was busy
+            // Every load is followed by a filter, so the latest reply is always over the newest list
+            if (pendingJobs) {
+                allJobs = pendingJobs;
+                pendingJobs = null;
+                pruneJobRowCache();
+            }
+            filteredIndices = msg.indices;
+            displayCurrentPage();
+            updateStatsFromFilteredJobs(msg.failedCount, msg.succeededCount, msg.totalCount);
+        }
+    };
 });
 
 function loadConfig() {
@@ -101,19 +159,26 @@ function loadConfig() {
 }
 
 function loadCategories() {
-    $.get('/api/categories')
+    const days = parseInt($('#daysFilter').val()) || 0;
+    
+    // Each category comes with its job and execution counts for the selected window
+    $.get('/api/categories', { days: days })
         .done(function(categories) {
             const select = $('#categoryFilter');
+            const totalFailed = categories.reduce((sum, category) => sum + category.failed_count, 0);
             select.empty();
-            select.append('<option value="">All Categories</option>');
+            select.append(`<option value="">All Categories (${totalFailed} failed)</option>`);
             
             categories.forEach(function(category) {
+                const name = category.category_name;
                 const option = $('<option></option>')
-                    .val(category)
-                    .text(category);
+                    .val(name)
+                    .text(category.execution_count
+                        ? `${name} (${category.failed_count} failed / ${category.execution_count} total)`
+                        : name);
                 
                 // Set default selected category
-                if (category === selectedCategory) {
+                if (name === selectedCategory) {
                     option.prop('selected', true);
                 }
                 
@@ -128,47 +193,29 @@ function loadCategories() {
         });
 }
 
-function updateCategoryCounts() {
-    if (!allJobs || allJobs.length === 0) return;
-    
-    // Count failed jobs per category
-    const categoryCounts = {};
-    allJobs.forEach(function(job) {
-        const category = job.category_name || 'Uncategorized';
-        if (!categoryCounts[category]) {
-            categoryCounts[category] = { total: 0, failed: 0 };
-        }
-        categoryCounts[category].total++;
-        if (job.run_status === 0) {
-            categoryCounts[category].failed++;
-        }
-    });
-    
-    // Update dropdown options with counts
-    $('#categoryFilter option').each(function() {
-        const category = $(this).val();
-        if (category === '') {
-            const totalFailed = allJobs.filter(j => j.run_status === 0).length;
-            $(this).text(`All Categories (${totalFailed} failed)`);
-        } else if (categoryCounts[category]) {
-            const counts = categoryCounts[category];
-            $(this).text(`${category} (${counts.failed} failed / ${counts.total} total)`);
-        }
-    });
-}
-
 function loadJobs() {
     const days = parseInt($('#daysFilter').val()) || 0;
     
-    $('#loading').show();
-    $('#jobsContainer').empty();
+    // Keep the current rows on screen during a refresh so they can be reused
+    if (allJobs.length === 0) {
+        $('#loading').show();
+    }
     
     $.get('/api/jobs', { days: days })
-        .done(function(data) {
-            allJobs = data;
-            updateCategoryCounts(data);
+        .done(function(data, textStatus, xhr) {
+            pendingJobs = data;
+            
+            // Only the fields the worker filters on are copied to it
+            filterWorker.postMessage({
+                type: 'load',
+                jobs: data.map(job => ({
+                    job_name: job.job_name,
+                    category_name: job.category_name,
+                    run_status: job.run_status
+                }))
+            });
             filterAndDisplayJobs();
-            updateRefreshTime();
+            updateRefreshTime(xhr);
         })
         .fail(function(xhr) {
             $('#jobsContainer').html('<div class="alert alert-danger">Failed to load jobs: ' + (xhr.responseJSON?.error || 'Unknown error') + '</div>');
@@ -178,7 +225,14 @@ function loadJobs() {
         });
 }
 
-function updateRefreshTime() {
+function updateRefreshTime(xhr) {
+    // The server answers with its last good result when msdb misses the query deadline
+    if (xhr && xhr.getResponseHeader('X-Data-Stale') === 'true') {
+        const age = parseInt(xhr.getResponseHeader('X-Data-Age')) || 0;
+        $('#lastRefreshTime').html(`<span class="text-warning" title="SQL Server is slow or unavailable">stale data, ${age}s old</span>`);
+        return;
+    }
+    
     const now = new Date();
     const timeString = now.toLocaleString('en-US', {
         month: '2-digit',
@@ -194,48 +248,32 @@ function updateRefreshTime() {
 }
 
 function filterAndDisplayJobs() {
-    const searchTerm = $('#searchInput').val().toLowerCase();
-    const showOnlyFailed = $('#showOnlyFailed').is(':checked');
-    
-    let filteredJobs = allJobs;
-    let statsJobs = allJobs; // For stats, ignore the "show only failed" filter
-    
-    // Filter by category
-    if (selectedCategory) {
-        filteredJobs = filteredJobs.filter(job => 
-            job.category_name === selectedCategory
-        );
-        statsJobs = statsJobs.filter(job => 
-            job.category_name === selectedCategory
-        );
-    }
-    
-    // Filter by search term
-    if (searchTerm) {
-        filteredJobs = filteredJobs.filter(job => 
-            job.job_name.toLowerCase().includes(searchTerm)
-        );
-        statsJobs = statsJobs.filter(job => 
-            job.job_name.toLowerCase().includes(searchTerm)
-        );
-    }
-    
-    // Filter by failed status (only for display, not for stats)
-    if (showOnlyFailed) {
-        filteredJobs = filteredJobs.filter(job => job.run_status === 0);
+    // The worker replies with the matching row indices and the stats counts
+    // (which ignore the "show only failed" filter)
+    filterWorker.postMessage({
+        type: 'filter',
+        id: ++filterRequestId,
+        category: selectedCategory,
+        searchTerm: $('#searchInput').val().toLowerCase(),
+        showOnlyFailed: $('#showOnlyFailed').is(':checked')
+    });
+}
+
+function displayCurrentPage() {
+    // Only the current page of the filtered rows is ever rendered
+    const totalPages = Math.ceil(filteredIndices.length / itemsPerPage);
+    if (currentPage > totalPages) {
+        currentPage = Math.max(1, totalPages);
     }
-    
-    // Paginate
-    const totalPages = Math.ceil(filteredJobs.length / itemsPerPage);
     const startIndex = (currentPage - 1) * itemsPerPage;
-    const endIndex = startIndex + itemsPerPage;
-    const paginatedJobs = filteredJobs.slice(startIndex, endIndex);
+    const endIndex = Math.min(startIndex + itemsPerPage, filteredIndices.length);
+    const paginatedJobs = [];
+    for (let i = startIndex; i < endIndex; i++) {
+        paginatedJobs.push(allJobs[filteredIndices[i]]);
+    }
     
     displayJobs(paginatedJobs);
-    renderPagination(totalPages, filteredJobs.length);
-    
-    // Update stats based on filtered jobs (excluding "show only failed" filter)
-    updateStatsFromFilteredJobs(statsJobs);
+    renderPagination(totalPages, filteredIndices.length);
 }
 
 function renderPagination(totalPages, totalItems) {
@@ -309,7 +347,7 @@ function renderPagination(totalPages, totalItems) {
         const page = parseInt($(this).data('page'));
         if (page && page !== currentPage && page >= 1 && page <= totalPages) {
             currentPage = page;
-            filterAndDisplayJobs();
+            displayCurrentPage();
             $('html, body').animate({ scrollTop: 0 }, 'fast');
         }
     });
@@ -317,150 +355,211 @@ function renderPagination(totalPages, totalItems) {
 
 function displayJobs(jobs) {
     const container = $('#jobsContainer');
-    container.empty();
+    // Detach rather than empty so cached rows keep their expanded steps and handlers
+    container.children().detach();
     
     if (jobs.length === 0) {
         container.html('<div class="alert alert-info">No jobs found matching the current filters.</div>');
         return;
     }
     
+    const fragment = document.createDocumentFragment();
     jobs.forEach(function(job) {
-        const statusClass = getStatusClass(job.run_status);
-        const statusText = job.status_text || 'Unknown';
-        const instanceId = job.instance_id || 'N/A';
-        
-        const jobCard = `
-            <div class="card job-card mb-3 fade-in">
-                <div class="card-body">
-                    <div class="row align-items-center">
-                        <div class="col-md-4">
-                            <h6 class="mb-0">${escapeHtml(job.job_name)}</h6>
-                            <small class="text-muted">${escapeHtml(job.category_name || 'N/A')}</small>
-                        </div>
-                        <div class="col-md-2">
-                            <span class="badge ${statusClass}">${statusText}</span>
-                        </div>
-                        <div class="col-md-3">
-                            <small><i class="bi bi-clock"></i> ${escapeHtml(job.last_run)}</small>
-                            ${job.duration_formatted ? `<br><small class="text-muted">Duration: ${escapeHtml(job.duration_formatted)}</small>` : ''}
-                        </div>
-                        <div class="col-md-3 text-end">
-                            <button class="btn btn-sm btn-outline-primary load-history" 
-                                    data-job-name="${escapeHtml(job.job_name)}"
-                                    data-instance-id="${instanceId}">
-                                <i class="bi bi-list-ul"></i> View Steps
-                            </button>
-                        </div>
-                    </div>
-                    ${job.message && job.run_status === 0 ? `
-                        <div class="row mt-2">
-                            <div class="col-12">
-                                <div class="alert alert-danger py-1 px-2 mb-0">
-                                    <small><strong>Error:</strong> ${escapeHtml(job.message.substring(0, 200))}${job.message.length > 200 ? '...' : ''}</small>
-                                </div>
-                            </div>
-                        </div>
-                    ` : ''}
-                    <div class="history-container mt-2" style="display: none;"></div>
-                </div>
-            </div>
-        `;
-        
-        container.append(jobCard);
+        fragment.appendChild(getJobRow(job));
     });
+    container[0].appendChild(fragment);
+}
+
+// Return the row element for a job, reusing the cached one if the job is unchanged
+function getJobRow(job) {
+    const key = job.instance_id;
+    const signature = `${job.run_status}|${job.last_run}|${job.duration_formatted}|${job.message}`;
+    const cached = jobRowCache.get(key);
+    if (cached && cached.signature === signature) {
+        return cached.element;
+    }
     
-    // Attach click handlers
-    $('.load-history').on('click', function() {
-        const instanceId = $(this).data('instance-id');
-        const historyContainer = $(this).closest('.card-body').find('.history-container');
-        
-        if (historyContainer.is(':visible')) {
-            historyContainer.slideUp();
-            $(this).html('<i class="bi bi-list-ul"></i> View Steps');
-        } else {
-            loadJobSteps(instanceId, historyContainer, $(this));
-            $(this).html('<i class="bi bi-chevron-up"></i> Hide Steps');
+    const element = $(renderJobCard(job));
+    // Only animate rows the first time they appear
+    element.one('animationend', function() {
+        element.removeClass('fade-in');
+    });
+    jobRowCache.set(key, { signature: signature, element: element[0] });
+    return element[0];
+}
+
+// Drop cached rows for executions that are no longer in the job list
+function pruneJobRowCache() {
+    const current = new Set(allJobs.map(job => job.instance_id));
+    jobRowCache.forEach(function(value, key) {
+        if (!current.has(key)) {
+            jobRowCache.delete(key);
         }
     });
 }
 
+function renderJobCard(job) {
+    const statusClass = getStatusClass(job.run_status);
+    const statusText = job.status_text || 'Unknown';
+    const instanceId = job.instance_id || 'N/A';
+    
+    return `
+        <div class="card job-card mb-3 fade-in">
+            <div class="card-body">
+                <div class="row align-items-center">
+                    <div class="col-md-4">
+                        <h6 class="mb-0">${escapeHtml(job.job_name)}</h6>
+                        <small class="text-muted">${escapeHtml(job.category_name || 'N/A')}</small>
+                    </div>
+                    <div class="col-md-2">
+                        <span class="badge ${statusClass}">${statusText}</span>
+                    </div>
+                    <div class="col-md-3">
+                        <small><i class="bi bi-clock"></i> ${escapeHtml(job.last_run)}</small>
+                        ${job.duration_formatted ? `<br><small class="text-muted">Duration: ${escapeHtml(job.duration_formatted)}</small>` : ''}
+                    </div>
+                    <div class="col-md-3 text-end">
+                        <button class="btn btn-sm btn-outline-primary load-history" 
+                                data-job-name="${escapeHtml(job.job_name)}"
+                                data-instance-id="${instanceId}">
+                            <i class="bi bi-list-ul"></i> View Steps
+                        </button>
+                    </div>
+                </div>
+                ${job.message && job.run_status === 0 ? `
+                    <div class="row mt-2">
+                        <div class="col-12">
+                            <div class="alert alert-danger py-1 px-2 mb-0">
+                                <small><strong>Error:</strong> ${escapeHtml(job.message.substring(0, 200))}${job.message.length > 200 ? '...' : ''}</small>
+                            </div>
+                        </div>
+                    </div>
+                ` : ''}
+                <div class="history-container mt-2" style="display: none;"></div>
+            </div>
+        </div>
+    `;
+}
+
 function loadJobSteps(instanceId, container, button) {
     container.html('<div class="text-center"><div class="spinner-border spinner-border-sm"></div> Loading steps...</div>');
     container.slideDown();
     button.html('<i class="bi bi-chevron-up"></i> Hide Steps');
     
-    $.get(`/api/job/steps/${instanceId}`)
-        .done(function(data) {
-            if (!data.steps || data.steps.length === 0) {
-                container.html('<div class="alert alert-info">No steps found for this execution</div>');
-                return;
-            }
-            
-            // Debug: Log steps to console
-            console.log('Job steps data:', data.steps);
-            
-            let html = `
-                <div class="p-3 border rounded steps-container">
-                    <h6>Job Steps for ${escapeHtml(data.job_name)}</h6>
-                    <table class="table table-sm table-hover">
-                        <thead>
-                            <tr>
-                                <th>Step</th>
-                                <th>Status</th>
-                                <th>Duration</th>
-                                <th>Message</th>
-                                <th>Actions</th>
-                            </tr>
-                        </thead>
-                        <tbody>
-            `;
-            
-            data.steps.forEach(function(step, index) {
-                const stepStatusClass = step.executed === false ? 'bg-secondary' : getStatusClass(step.run_status);
-                const hasSSIS = (step.ssis_execution_id || step.ssis_package_path) && step.executed !== false;
-                const stepLabel = step.step_id === 0 ? '(Job Outcome)' : `Step ${step.step_id}`;
-                const stepName = step.step_name || 'N/A';
-                const rowClass = step.executed === false ? 'table-secondary' : '';
-                const isTSQL = step.subsystem === 'TSQL' && step.command;
-                const stepId = `step-${index}`;
-                
-                // Store step data for later retrieval
-                if (!window.stepDataCache) window.stepDataCache = {};
-                window.stepDataCache[stepId] = step;
-                
-                html += `
-                    <tr class="${rowClass}">
-                        <td>
-                            <strong>${escapeHtml(stepName)}</strong>
-                            <br><small class="text-muted">${stepLabel}</small>
-                            ${step.ssis_package_path ? `<br><small class="text-info"><i class="bi bi-box"></i> ${escapeHtml(step.ssis_package_path)}</small>` : ''}
-                            ${isTSQL ? `<br><small class="text-primary"><i class="bi bi-code-square"></i> T-SQL Script</small>` : ''}
-                        </td>
-                        <td><span class="badge ${stepStatusClass}">${escapeHtml(step.status_text)}</span></td>
-                        <td>${escapeHtml(step.duration_formatted || 'N/A')}</td>
-                        <td>
-                            <div class="text-truncate" style="max-width: 400px;" title="${escapeHtml(step.message || '')}">
-                                ${escapeHtml((step.message || 'N/A').substring(0, 150))}${step.message && step.message.length > 150 ? '...' : ''}
-                            </div>
-                        </td>
-                        <td>
-                            ${hasSSIS ? `<button class="btn btn-sm btn-outline-info me-1" onclick="loadSSISDetailsForStep(window.stepDataCache['${stepId}'])">
-                                <i class="bi bi-file-earmark-text"></i> SSIS Logs
-                            </button>` : ''}
-                            ${isTSQL ? `<button class="btn btn-sm btn-outline-primary" onclick="showTSQLScript('${stepId}')">
-                                <i class="bi bi-code-square"></i> View SQL
-                            </button>` : ''}
-                        </td>
-                    </tr>
-                `;
+    pendingStepLoads.push({ instanceId: instanceId, container: container });
+    if (!stepLoadTimer) {
+        stepLoadTimer = setTimeout(flushStepLoads, 50);
+    }
+}
+
+function flushStepLoads() {
+    const loads = pendingStepLoads;
+    pendingStepLoads = [];
+    stepLoadTimer = null;
+    
+    if (loads.length === 1) {
+        const load = loads[0];
+        $.get(`/api/job/steps/${load.instanceId}`)
+            .done(function(data) {
+                renderJobSteps(data, load.container);
+            })
+            .fail(function(xhr) {
+                load.container.html(`<div class="alert alert-danger">Failed to load steps: ${xhr.responseJSON?.error || 'Unknown error'}</div>`);
             });
-            
-            html += '</tbody></table></div>';
-            container.html(html);
-        })
-        .fail(function(xhr) {
-            container.html(`<div class="alert alert-danger">Failed to load steps: ${xhr.responseJSON?.error || 'Unknown error'}</div>`);
-        });
+        return;
+    }
+    
+    for (let i = 0; i < loads.length; i += maxStepBatch) {
+        const batch = loads.slice(i, i + maxStepBatch);
+        $.get('/api/job/steps/batch', { ids: batch.map(load => load.instanceId).join(',') })
+            .done(function(data) {
+                const executions = {};
+                data.executions.forEach(function(execution) {
+                    executions[execution.instance_id] = execution;
+                });
+                batch.forEach(function(load) {
+                    if (executions[load.instanceId]) {
+                        renderJobSteps(executions[load.instanceId], load.container);
+                    } else {
+                        load.container.html('<div class="alert alert-danger">Failed to load steps: Execution not found</div>');
+                    }
+                });
+            })
+            .fail(function(xhr) {
+                batch.forEach(function(load) {
+                    load.container.html(`<div class="alert alert-danger">Failed to load steps: ${xhr.responseJSON?.error || 'Unknown error'}</div>`);
+                });
+            });
+    }
+}
+
+function renderJobSteps(data, container) {
+    if (!data.steps || data.steps.length === 0) {
+        container.html('<div class="alert alert-info">No steps found for this execution</div>');
+        return;
+    }
+    
+    // Debug: Log steps to console
+    console.log('Job steps data:', data.steps);
+    
+    let html = `
+        <div class="p-3 border rounded steps-container">
+            <h6>Job Steps for ${escapeHtml(data.job_name)}</h6>
+            <table class="table table-sm table-hover">
+                <thead>
+                    <tr>
+                        <th>Step</th>
+                        <th>Status</th>
+                        <th>Duration</th>
+                        <th>Message</th>
+                        <th>Actions</th>
+                    </tr>
+                </thead>
+                <tbody>
+    `;
+    
+    data.steps.forEach(function(step, index) {
+        const stepStatusClass = step.executed === false ? 'bg-secondary' : getStatusClass(step.run_status);
+        const hasSSIS = (step.ssis_execution_id || step.ssis_package_path) && step.executed !== false;
+        const stepLabel = step.step_id === 0 ? '(Job Outcome)' : `Step ${step.step_id}`;
+        const stepName = step.step_name || 'N/A';
+        const rowClass = step.executed === false ? 'table-secondary' : '';
+        const isTSQL = step.subsystem === 'TSQL' && step.command;
+        const stepId = `step-${data.instance_id}-${index}`;
+        
+        // Store step data for later retrieval
+        if (!window.stepDataCache) window.stepDataCache = {};
+        window.stepDataCache[stepId] = step;
+        
+        html += `
+            <tr class="${rowClass}">
+                <td>
+                    <strong>${escapeHtml(stepName)}</strong>
+                    <br><small class="text-muted">${stepLabel}</small>
+                    ${step.ssis_package_path ? `<br><small class="text-info"><i class="bi bi-box"></i> ${escapeHtml(step.ssis_package_path)}</small>` : ''}
+                    ${isTSQL ? `<br><small class="text-primary"><i class="bi bi-code-square"></i> T-SQL Script</small>` : ''}
+                </td>
+                <td><span class="badge ${stepStatusClass}">${escapeHtml(step.status_text)}</span></td>
+                <td>${escapeHtml(step.duration_formatted || 'N/A')}</td>
+                <td>
+                    <div class="text-truncate" style="max-width: 400px;" title="${escapeHtml(step.message || '')}">
+                        ${escapeHtml((step.message || 'N/A').substring(0, 150))}${step.message && step.message.length > 150 ? '...' : ''}
+                    </div>
+                </td>
+                <td>
+                    ${hasSSIS ? `<button class="btn btn-sm btn-outline-info me-1" onclick="loadSSISDetailsForStep(window.stepDataCache['${stepId}'])">
+                        <i class="bi bi-file-earmark-text"></i> SSIS Logs
+                    </button>` : ''}
+                    ${isTSQL ? `<button class="btn btn-sm btn-outline-primary" onclick="showTSQLScript('${stepId}')">
+                        <i class="bi bi-code-square"></i> View SQL
+                    </button>` : ''}
+                </td>
+            </tr>
+        `;
+    });
+    
+    html += '</tbody></table></div>';
+    container.html(html);
 }
 
 function loadJobHistory(jobName, container, button) {
@@ -867,12 +966,8 @@ function loadStats() {
         });
 }
 
-// Update stats based on filtered jobs
-function updateStatsFromFilteredJobs(jobs) {
-    const failedCount = jobs.filter(j => j.run_status === 0).length;
-    const succeededCount = jobs.filter(j => j.run_status === 1).length;
-    const totalCount = jobs.length;
-    
+// Update stats based on the filtered job counts from the worker
+function updateStatsFromFilteredJobs(failedCount, succeededCount, totalCount) {
     let successRate = 0;
     if (totalCount > 0) {
         successRate = (succeededCount / totalCount) * 100;
@@ -938,6 +1033,7 @@ function startAutoRefresh() {
         updateRefreshCountdown();
         
         if (refreshCountdown <= 0) {
+            loadCategories();
             loadJobs();
             loadStats();
             refreshCountdown = 60;